@@ -1,11 +1,18 @@
 import sys
 import copy
+import itertools
+import contextlib
+import struct
+import weakref
 from Player import Player
 from Ship import Ship, Battleship, Submarine, HitDuplicate, getShipTypes, getShipClasses, shipType2Ship
 from lst2str import lst2str
-from printArgs import printArgs
+import tracing
 from Coord import Coord
+from ShotResult import ShotResult, FireOutcome, SalvoResult
 from chooseFromList import chooseFromList
+from bitMask import cellBit, iterBits, iterCells, popcount
+from PlacementIndex import PlacementIndex
 from random import randint
 
 
@@ -13,6 +20,21 @@ from random import randint
 from colorama import init, Fore, Style
 init()
 
+# Trace points for this module (see tracing)
+_trace = tracing.getTracer("Board")
+
+# Characters for water that has not been hit and water that has
+water = "O"
+charWater = Fore.BLUE + Style.DIM + water + Style.RESET_ALL
+charWaterHit = Fore.BLUE + Style.BRIGHT + water + Style.RESET_ALL
+
+
+# Events that can be subscribed to with Board.subscribe
+boardEvents = ("place", "miss", "hit", "sunk", "defeated", "undo")
+
+# Returned by _fireAt for a shot at a cell already fired at
+_duplicateShot = -2
+
 
 ################################################################################
 # Board class
@@ -52,14 +74,52 @@ class Board(object):
 	# command is evaluated.  Thus, a single mutable list ([]) is generated for
 	# all calls to the function and just changed over and over again in future.
 
-	def __init__(self, rows, cols, name="Unnamed"):
+	def __init__(self, rows, cols, name="Unnamed", sparse=False, bitboard=False):
 		self.name = name
 		self.rows = rows
 		self.cols = cols
 
-		# Initialize storage containers for ships and hits to water
+		# Sparse boards only store the cells that have ships on them or have
+		# been fired at (cellIndex and waterhits below), so their memory
+		# doesn't grow with rows*cols and they can be huge.  There is no
+		# shipMap (it is None) and random placement picks placements at
+		# random until one fits rather than using a placementIndex.  The
+		# bitboard masks are rows*cols bits, so they can't be used as well.
+		if sparse and bitboard:
+			raise ValueError("A board can't be both sparse and bitboard")
+		self.sparse = sparse
+
+		# Initialize storage containers for ships and hits to water.
+		# waterhits is a set of Coords so that checking for a repeated miss
+		# doesn't get slower as the game goes on.  The order shots came in is
+		# kept separately in shotHistory as a list of (Coord, hitIndex) where
+		# hitIndex is the value processFire returned (-1 for a miss).
 		self.ships = []
-		self.waterhits = []
+		self.waterhits = None if bitboard else set()
+		self.shotHistory = []
+
+		# Running totals for getHealth: total cells of all ships on the board
+		# and how many of them have been hit.  Kept up to date by addShip,
+		# processFire and undoShot.  Bitboard boards count the bits in their
+		# masks instead and leave these at 0.
+		self.shipCells = 0
+		self.hitsTaken = 0
+
+		# Optional bitboard backend.  If bitboard == True, occupancy, ship hits
+		# and water hits are integer masks (one bit per cell, numbered
+		# row-major - see bitMask.cellBit) and those masks are the board's
+		# state: addShip checks overlap against occupiedMask, processFire
+		# tests and sets bits, getHealth/isDefeated count and compare bits
+		# and display reads the masks.  shipMasks[i] holds the cells of
+		# ships[i].  There is no waterhits set (it is None).  The masks are
+		# ints, so a clone shares them for free.  Ships still record their
+		# own hits (so Ship objects such as FireOutcome.ship behave the same),
+		# but the board doesn't read them.
+		self.bitboard = bitboard
+		self.occupiedMask = 0
+		self.hitMask = 0
+		self.waterMask = 0
+		self.shipMasks = []
 
 		# shipMap is the internal representation of the ships on the board,
 		# where -1 means nothing and any value of >=0 is the index of the ship
@@ -71,16 +131,54 @@ class Board(object):
 		# but because the [-1]*cols makes a mutable object, the *rows just makes
 		# a bunch of references to the same initial mutable object.  That means
 		# changing element 0,0 also changes elements 1,0, 2,0, ...
-		self.shipMap = [[-1 for x in range(cols)] for x in range(rows)]
+		if sparse:
+			self.shipMap = None
+		else:
+			self.shipMap = [[-1 for x in range(cols)] for x in range(rows)]
+
+		# cellIndex maps each occupied (row, col) to (ship index, segment index)
+		# so that a shot can be resolved with one lookup rather than asking
+		# every ship whether it was hit.  Built by addShip.
+		self.cellIndex = {}
+
+		# Legal placements left for each ship length, used for random
+		# placement.  Made the first time populateBoard places a ship
+		# randomly, then kept up to date by addShip.
+		self.placementIndex = None
 
 		# NOTE: I don't think I ended up fully using the shipMap.  I ended up
 		# building the map during display() calls, and only using it during
 		# addship... could probably remove it with little effort.  Or used more below to
 		# actually take advantage of the thing...
 
-
-
-	def display(self, visible="revealed", sDisp="ID" , debug = False):
+		# Cache of rendered boards for display, keyed by
+		# (visible, sDisp, rows, cols).  Each entry holds the rendered cells,
+		# the rendered rows and the set of cells that changed since it was
+		# rendered (filled in by processFire/addShip through _markDirty).
+		self._renderCache = {}
+
+		# Copy-on-write state for clone().  A clone shares everything with the
+		# board it came from until one of them changes something:
+		#	Hit state - the ships (whose hits lists are the hit state),
+		#		waterhits and shotHistory.  _hitSharers is a WeakSet of the
+		#		clones sharing them, the same set object on the board they
+		#		belong to and on each of those clones (which have _sharedHits
+		#		set), or None if nothing is shared.  Sorted out by _ownHits
+		#		before a shot is recorded.
+		#	_sharedLayout - shipMap, cellIndex and shipMasks are shared.
+		#		Copied by _ownLayout before a ship is added.
+		self._sharedHits = False
+		self._hitSharers = None
+		self._sharedLayout = False
+
+		# Callbacks for board events (see subscribe), keyed by event name.
+		# Each value is a tuple so callbacks can unsubscribe while being
+		# called.  Left empty, the only cost to a shot is checking this.
+		self._subscribers = {}
+
+
+	def display(self, visible="revealed", sDisp="ID", stream = None, rowRange = None, colRange = None,
+	            center = None, viewSize = (21, 21)):
 		"""
 		Method to generate a string showing the status of the board.
 
@@ -106,45 +204,142 @@ class Board(object):
 		:param sDisp: Toggle for the ship display mode:
 			ID  -   Ship is identified with its numeric ID
 			type-   Ship is identified with its type
-		:return: String shownig the board
+		:param stream: (Optional) Text stream (eg an open file) to write the
+					   board to line by line instead of returning it
+		:param rowRange: (Optional) (start, stop) of the rows to show, as for
+						 range().  Clipped to the board.  Default is all rows.
+		:param colRange: (Optional) (start, stop) of the columns to show
+		:param center: (Optional) Coordinate to center a window of viewSize
+					   on (moved in from the edges to stay on the board), or
+					   "last" for the most recent shot.  Overrides rowRange
+					   and colRange.
+		:param viewSize: (rows, cols) of the window used with center
+		:return: String shownig the board, or None if stream is given
+
+		Sparse boards can be far too big to show whole, so if no window is
+		given (rowRange, colRange or center) they show the viewSize window
+		around the latest shot, as if center="last".
 		"""
 
 		# Method:
-		# Build 2D list of characters for the playing field of the board
-		#   For each element of each ship, assign a character to the
-		#   corresponding element of the board list.  Choose which type of
-		#   character to use based on visible/sDisp
-		# Build the header and sider character 2D lists
-		# Assemble the lists into a single board
-		# Return board as a string
-
-		if debug == True:
-			# Print all function arguments to screen for easy debugging
-			# Exclude 'self' to avoid infinite loop (printing self calls
-			# __repr__, which calls display, which ...
-			printArgs(exclude=['self'])
-
-		# Define a character for water that has not been hit
-		# if visible=="all":
-		# 	charWater = Style.BRIGHT +"o"
-		# else:
-		# 	charWater = Style.DIM + "o"
-		water = "O"
-		charWater = Fore.BLUE + Style.DIM + water + Style.RESET_ALL
+		# Renders are cached per (visible, sDisp, board size).  The first time:
+		#	Build 2D list of characters for the playing field of the board
+		#	(see _renderOcean)
+		#	Join each row of the playing field to its sider.  The header and
+		#	sider are only built once per board size (see makeBorders)
+		# After that, only the cells that processFire/addShip marked as changed
+		# are re-rendered, and only their rows are re-joined.
+		# Return header and rows as a string
+
+		if _trace.enabled: _trace("display", "Board {} display(visible={}, sDisp={})", self.name, visible, sDisp)
+
+		if not sDisp in ["ID", "type"]:
+			raise Exception("Unknown value for sDisp.  Must be \"ID\" or \"type\"")
+		if not visible in ["all", "revealed"]:
+			raise Exception("Unknown value for visible.  Must be \"all\" or \"revealed\"")
+
+		# Only part of the board asked for - render just that window
+		if self.sparse and center is None and rowRange is None and colRange is None:
+			center = "last"
+		if center is not None:
+			rowRange, colRange = self._centeredView(center, viewSize)
+		if rowRange is not None or colRange is not None:
+			rowRange = _clipRange(rowRange, self.rows, "rowRange")
+			colRange = _clipRange(colRange, self.cols, "colRange")
+			if rowRange != (0, self.rows) or colRange != (0, self.cols):
+				return self._displayWindow(visible, sDisp, rowRange, colRange, stream)
+
+		headerLines, siders = makeBorders(self.rows, self.cols)
+
+		key = (visible, sDisp, self.rows, self.cols)
+		cache = self._renderCache.get(key)
+		if cache is None:
+			# Render everything
+			if _trace.enabled: _trace("display.render", "Board {} rendered in full", self.name)
+			ocean = self._renderOcean(visible, sDisp)
+			rowLines = [siders[i] + "".join(ocean[i]) for i in range(self.rows)]
+			cache = {"ocean": ocean, "rows": rowLines, "dirty": set()}
+			self._renderCache[key] = cache
+		elif cache["dirty"]:
+			if _trace.enabled: _trace("display.update", "Board {} re-rendering {} cells", self.name, len(cache["dirty"]))
+			# Re-render only the changed cells and their rows
+			ocean = cache["ocean"]
+			rowLines = cache["rows"]
+			dirtyRows = set()
+			for (r, c) in cache["dirty"]:
+				ocean[r][c] = self._cellChar(r, c, visible, sDisp)
+				dirtyRows.add(r)
+			for r in dirtyRows:
+				rowLines[r] = siders[r] + "".join(ocean[r])
+			cache["dirty"].clear()
+
+		# Header and rows are already strings, so lst2str just adds the
+		# newlines
+		lines = itertools.chain(headerLines, cache["rows"])
+		if stream is not None:
+			lst2str(lines, stream=stream)
+			return None
+		return lst2str(lines)
+
+	def _centeredView(self, center, viewSize):
+		"""
+		Returns (rowRange, colRange) for a window of viewSize centered on
+		center (a coordinate or "last" for the latest shot) and moved in from
+		the edges to stay on the board
+		"""
+		if center == "last":
+			if self.shotHistory:
+				center = self.shotHistory[-1][0]
+			else:
+				center = (self.rows // 2, self.cols // 2)
+		center = Coord(center)
 
+		ranges = []
+		for middle, size, length in ((center.x, viewSize[0], self.rows), (center.y, viewSize[1], self.cols)):
+			size = min(size, length)
+			start = min(max(middle - size // 2, 0), length - size)
+			ranges.append((start, start + size))
+		return tuple(ranges)
+
+	def _displayWindow(self, visible, sDisp, rowRange, colRange, stream):
+		"""
+		Renders only rows rowRange and columns colRange of the board (see
+		display), cell by cell.  The time taken depends on the size of the
+		window, not the board.  Windows aren't cached.
+		"""
+		if _trace.enabled: _trace("display.window", "Board {} rendering rows {} cols {}", self.name, rowRange, colRange)
+		headerLines, siders = makeBorders(rowRange[1] - rowRange[0], colRange[1] - colRange[0],
+		                                  rowRange[0], colRange[0])
+		cellChar = self._cellChar
+		rowLines = (siders[i] + "".join([cellChar(r, c, visible, sDisp) for c in range(*colRange)])
+		            for i, r in enumerate(range(*rowRange)))
+		lines = itertools.chain(headerLines, rowLines)
+		if stream is not None:
+			lst2str(lines, stream=stream)
+			return None
+		return lst2str(lines)
+
+	def _renderOcean(self, visible, sDisp):
+		"""
+		Builds the 2D list of characters for the playing field of the board
+		(no header or sider)
+
+		:param visible: See display
+		:param sDisp: See display
+		:return: 2D list of strings, one per cell
+		"""
 		# Initialize ocean, a list for the part of the board where sea/ships
 		# are located
 		ocean = [[charWater for x in range(self.cols)] for y in range(self.rows)]
 
+		if self.bitboard:
+			# Fill ships and water in from the masks
+			self._displayMasks(ocean, visible, sDisp)
+			return ocean
+
 		# Loop through ships and display them in ocean if appropriate
 		for j,ship in enumerate(self.ships):
-			if debug == True:
-				print("Placing ship \"{}\" in ocean".format(ship.name))
-
 			for i,coord in enumerate(ship.coords):
-				if debug == True:
-					print("\tProcessing coordinate {} {}".format(i,coord))
-
 				# Set character to use for ship based on sDisp
 				if sDisp == "ID":
 					charShip = str(j)
@@ -162,7 +357,7 @@ class Board(object):
 						charShip = Fore.YELLOW + charShip + Style.RESET_ALL
 				elif visible == "revealed":
 					if ship.hits[i] == True:
-						if ship.getHealth()["remaining"] == 0:
+						if ship.isSunk():
 							charShip = Fore.RED + charShip + Style.RESET_ALL
 						else:
 							charShip = Fore.RED + "?" + Style.RESET_ALL
@@ -172,54 +367,410 @@ class Board(object):
 				else:
 					raise Exception("Unknown value for visible.  Must be \"all\" or \"revealed\"")
 
-				if debug == True:
-					print("\tSea at {} updated to {}".format(coord,charShip))
 				ocean[coord.x][coord.y] = charShip
 
 		# Loop through all water hits and add to board
-		charWaterHit = Fore.BLUE + Style.BRIGHT + water + Style.RESET_ALL
 		for coord in self.waterhits:
 			ocean[coord.x][coord.y] = charWaterHit
 
-		if debug == True:
-			print("ocean as string:")
-			print(lst2str(ocean))
+		return ocean
 
-		# Define the border areas (header and sider)
+	def _displayMasks(self, ocean, visible, sDisp):
+		"""
+		Fills ships and water hits into ocean (in place) using the bitboard
+		masks.  Produces the same characters as the list walk in _renderOcean.
 
-		# Define border text style as function (easier to update later)
-		# Should I have used this above for the ship characters?
-		def borderText(text):
-			return Fore.CYAN + str(text) + Style.RESET_ALL
+		:param ocean: 2D list of characters for the playing field, initialized to unhit water
+		:param visible: See display
+		:param sDisp: See display
+		:return: Nothing, but updates ocean
+		"""
+		for j, shipMask in enumerate(self.shipMasks):
+			if sDisp == "ID":
+				charShip = str(j)
+			else:
+				charShip = str(self.ships[j].boardID)
+
+			hitCells = shipMask & self.hitMask
+			if visible == "all":
+				charHit = Fore.RED + charShip + Style.RESET_ALL
+				charNotHit = Fore.YELLOW + charShip + Style.RESET_ALL
+				for (r, c) in iterCells(shipMask, self.cols):
+					if hitCells >> (r * self.cols + c) & 1:
+						ocean[r][c] = charHit
+					else:
+						ocean[r][c] = charNotHit
+			else:
+				# Only hit cells are shown.  The identity is shown once all
+				# of the ship's cells are hit (ie, it is sunk)
+				if hitCells == shipMask:
+					charHit = Fore.RED + charShip + Style.RESET_ALL
+				else:
+					charHit = Fore.RED + "?" + Style.RESET_ALL
+				for (r, c) in iterCells(hitCells, self.cols):
+					ocean[r][c] = charHit
 
-		# Generate header and sider
-		headerLst = makeHeader(range(self.cols), spacer='-')
-		if debug == True:
-			print("header as string:")
-			print(borderText(lst2str(headerLst)))
+		for (r, c) in iterCells(self.waterMask, self.cols):
+			ocean[r][c] = charWaterHit
 
-		sider = makeHeader(range(self.rows), spacer='|')
-		sider = lstTranspose(sider)
-		if debug == True:
-			print("sider as string:")
-			print(borderText(lst2str(sider)))
+	def _cellChar(self, r, c, visible, sDisp):
+		"""
+		Returns the character for a single cell of the playing field (same
+		rules as _renderOcean)
+
+		:param r: Row of the cell
+		:param c: Column of the cell
+		:param visible: See display
+		:param sDisp: See display
+		:return: String for the cell
+		"""
+		shipSegment = self.cellIndex.get((r, c))
+		if shipSegment is None:
+			if self.bitboard:
+				fired = self.waterMask >> (r * self.cols + c) & 1
+			else:
+				# probe, so drawing a window doesn't pool a Coord per cell
+				fired = Coord.probe(r, c) in self.waterhits
+			if fired:
+				return charWaterHit
+			return charWater
+
+		j, i = shipSegment
+		ship = self.ships[j]
+		if sDisp == "ID":
+			charShip = str(j)
+		else:
+			charShip = str(ship.boardID)
 
-		# Assemble sider and ocean together
-		boardLst = [sider[i] + ocean[i] for i in range(len(sider))]
+		if self.bitboard:
+			hit = self.hitMask >> (r * self.cols + c) & 1
+		else:
+			hit = ship.hits[i]
+		if visible == "all":
+			if hit:
+				return Fore.RED + charShip + Style.RESET_ALL
+			else:
+				return Fore.YELLOW + charShip + Style.RESET_ALL
+		elif hit:
+			if self.isSunk(j):
+				return Fore.RED + charShip + Style.RESET_ALL
+			else:
+				return Fore.RED + "?" + Style.RESET_ALL
+		return charWater
 
-		# Top with header, but shift header over by width of sider to align properly
-		boardLst = [[" "]*len(sider[0]) + row for row in headerLst] + boardLst
+	def _markDirty(self, coords):
+		"""
+		Records that the cells at coords have changed so cached renders
+		(see display) update them next time.  Costs nothing if nothing has
+		been rendered yet.
 
-		if debug == True:
-			print("final board as string:")
-			print(lst2str(boardLst))
+		:param coords: Iterable of Coord objects
+		:return: Nothing
+		"""
+		for cache in self._renderCache.values():
+			cache["dirty"].update((coord.x, coord.y) for coord in coords)
 
-		return lst2str(boardLst)
+	def _markShotDirty(self, fireCoord, shipIndex):
+		"""
+		_markDirty for a shot.  If the shot sank a ship the whole ship is
+		marked, as its identity is now revealed.
+
+		:param fireCoord: Coord that was fired at
+		:param shipIndex: Index of the ship hit, or -1 for a miss
+		:return: Nothing
+		"""
+		if shipIndex >= 0 and self.isSunk(shipIndex):
+			self._markDirty(self.ships[shipIndex].coords)
+		else:
+			self._markDirty((fireCoord,))
+
+	def clone(self):
+		"""
+		Returns a copy of this board that can be fired on (or have ships added)
+		independently of the original.
+
+		Unlike copy.deepcopy, nothing is copied up front: the clone shares all
+		its data with this board until one of them changes it (see _ownHits
+		and _ownLayout).  Only the clone ever gets copies of the ships, so
+		this board keeps its own Ship objects and any references to them (eg
+		FireOutcome.ship) keep following this board.  The ship positions are
+		never copied by firing.
+
+		The clone starts with no subscribers (see subscribe), either on the
+		board or its ships: it gets its own unsubscribed ships before its
+		first shot, so shots at it never reach this board's subscribers.
+
+		:return: New Board
+		"""
+		other = copy.copy(self)
+		other._renderCache = {}
+		other._subscribers = {}
+		self._sharedLayout = other._sharedLayout = True
+
+		# The clone shares our hit state until one of us writes (see _ownHits)
+		if self._hitSharers is None:
+			self._hitSharers = weakref.WeakSet()
+		self._hitSharers.add(other)
+		other._hitSharers = self._hitSharers
+		other._sharedHits = True
+		return other
+
+	def _ownHits(self):
+		"""
+		Stops sharing the hit state (ships, waterhits and shotHistory) with
+		clones, so that this board can change it.  Bitboard masks are ints,
+		which are never changed in place, so they need no copying.
+
+		A clone sharing another board's hit state replaces it with copies of
+		its own.  The copied ships get their own hits lists but share their
+		(never changed) coords, and start with no subscribers.  The board the hit state belongs to keeps it
+		and has every clone still sharing it take copies instead.
+
+		:return: Nothing
+		"""
+		sharers = self._hitSharers
+		self._hitSharers = None
+		if not self._sharedHits:
+			for board in list(sharers):
+				board._ownHits()
+			return
+
+		sharers.discard(self)
+		ships = []
+		for ship in self.ships:
+			ship = copy.copy(ship)
+			ship.hits = list(ship.hits)
+			ship._subscribers = None
+			ships.append(ship)
+		self.ships = ships
+		if self.waterhits is not None:
+			self.waterhits = set(self.waterhits)
+		self.shotHistory = list(self.shotHistory)
+		self._sharedHits = False
+
+	def __getstate__(self):
+		"""
+		State for copy/deepcopy/pickle.  Like clone(), copies start with no
+		subscribers (see subscribe) and an empty render cache, and they leave
+		out clone() sharing (a deep copy or unpickled board owns everything it
+		has).
+		"""
+		state = self.__dict__.copy()
+		state["_hitSharers"] = None
+		state["_sharedHits"] = False
+		state["_subscribers"] = {}
+		state["_renderCache"] = {}
+		return state
+
+	def _ownLayout(self):
+		"""
+		Replaces the layout shared with a clone (shipMap, cellIndex and
+		shipMasks) with copies owned by this board.  The ships list is changed
+		when a ship is added too, so the hit state is also made our own.
+
+		:return: Nothing
+		"""
+		if self._hitSharers is not None:
+			self._ownHits()
+		if self.shipMap is not None:
+			self.shipMap = [row[:] for row in self.shipMap]
+		self.cellIndex = dict(self.cellIndex)
+		self.shipMasks = list(self.shipMasks)
+		# placementIndex reads shipMap, so start a new one when needed
+		self.placementIndex = None
+		self._sharedLayout = False
+
+	def toBytes(self):
+		"""
+		Returns the board (size, ships and everything fired so far) packed in a
+		compact, versioned binary format.  Read back with Board.fromBytes.
+
+		Format (version 1, all integers little-endian):
+			header - magic b"BSHP", version, flags (bit 0: bitboard, bit 1:
+					 sparse),
+					 rows, cols, number of ships, number of ship kinds,
+					 number of ship names
+			board name
+			ship kinds - for each distinct (class name, shipClass, boardID,
+					 length): the three strings and the length
+			ship names - each distinct ship name once
+			ships - 15 bytes each: kind index, name index, origin row and
+					 col and direction (0-3 for R/D/L/U)
+			ship hits - one bit per ship segment, in ship order
+			water hits - a bitmask of the board, or a list of cell numbers
+					 if that is smaller
+		Strings are stored as a 2 byte length followed by UTF-8.
+
+		Only what was hit is kept, not the order of the shots, so after
+		fromBytes the shotHistory is in row-major order.
+
+		Ships must be straight lines (as from getStraightCoords), otherwise
+		InvalidBoardData is raised.
+
+		:return: bytes
+		"""
+		kinds = {}
+		names = {}
+		shipRecords = []
+		for ship in self.ships:
+			kind = (type(ship).__name__, str(ship.shipClass), str(ship.boardID), ship.length)
+			kindIndex = kinds.setdefault(kind, len(kinds))
+			nameIndex = names.setdefault(str(ship.name), len(names))
+			origin = ship.coords[0]
+			shipRecords.append(_shipStruct.pack(kindIndex, nameIndex, origin.x, origin.y,
+			                                    _shipDirection(ship)))
+
+		flags = (1 if self.bitboard else 0) | (2 if self.sparse else 0)
+		parts = [_headerStruct.pack(_bytesMagic, _bytesVersion, flags, self.rows, self.cols,
+		                            len(self.ships), len(kinds), len(names)),
+		         _packString(self.name)]
+		for kind in sorted(kinds, key=kinds.get):
+			parts.extend([_packString(kind[0]), _packString(kind[1]), _packString(kind[2]),
+			              struct.pack("<H", kind[3])])
+		for name in sorted(names, key=names.get):
+			parts.append(_packString(name))
+		parts.extend(shipRecords)
+
+		# Ship hits, one bit per segment
+		if self.bitboard:
+			hits = [self.hitMask >> (coord.x * self.cols + coord.y) & 1 for ship in self.ships for coord in ship.coords]
+		else:
+			hits = [hit for ship in self.ships for hit in ship.hits]
+		hitBits = bytearray((len(hits) + 7) // 8)
+		for bit, hit in enumerate(hits):
+			if hit:
+				hitBits[bit >> 3] |= 1 << (bit & 7)
+		parts.append(bytes(hitBits))
+
+		# Water hits as whichever of bitmask/list is smaller.  The bitmask is
+		# the same bit numbering as the bitboard masks.
+		nCells = self.rows * self.cols
+		if self.bitboard:
+			nWater = popcount(self.waterMask)
+		else:
+			nWater = len(self.waterhits)
+		if 8 + 8 * nWater < (nCells + 7) // 8:
+			if self.bitboard:
+				cells = list(iterBits(self.waterMask))
+			else:
+				cells = sorted(coord.x * self.cols + coord.y for coord in self.waterhits)
+			parts.append(struct.pack("<BQ", 1, len(cells)))
+			parts.append(struct.pack("<{}Q".format(len(cells)), *cells))
+		else:
+			if self.bitboard:
+				waterBits = self.waterMask.to_bytes((nCells + 7) // 8, "little")
+			else:
+				waterBits = bytearray((nCells + 7) // 8)
+				for coord in self.waterhits:
+					cell = coord.x * self.cols + coord.y
+					waterBits[cell >> 3] |= 1 << (cell & 7)
+			parts.append(struct.pack("<B", 0))
+			parts.append(bytes(waterBits))
+
+		return b"".join(parts)
+
+	@classmethod
+	def fromBytes(cls, data):
+		"""
+		Rebuilds a Board from the output of toBytes.
+
+		Ships are remade as their original Ship subclass (looked up by name
+		among getShipClasses()) or as a plain Ship if that class isn't
+		available.  Shots are replayed through processFire in row-major
+		order.
+
+		Raises InvalidBoardData if data isn't in a format this version can read.
+
+		:param data: bytes from toBytes
+		:return: New Board
+		"""
+		data = memoryview(data)
+		try:
+			(magic, version, flags, rows, cols, nShips, nKinds,
+			 nNames) = _headerStruct.unpack_from(data, 0)
+		except struct.error:
+			raise InvalidBoardData("Board data too short")
+		if magic != _bytesMagic:
+			raise InvalidBoardData("Not board data (magic {})".format(bytes(magic)))
+		if version != _bytesVersion:
+			raise InvalidBoardData("Board data version {} not supported (expected {})".format(version, _bytesVersion))
+
+		try:
+			offset = _headerStruct.size
+			name, offset = _unpackString(data, offset)
+			kinds = []
+			for i in range(nKinds):
+				className, offset = _unpackString(data, offset)
+				shipClass, offset = _unpackString(data, offset)
+				boardID, offset = _unpackString(data, offset)
+				length = struct.unpack_from("<H", data, offset)[0]
+				offset += 2
+				kinds.append((className, shipClass, boardID, length))
+			names = []
+			for i in range(nNames):
+				shipName, offset = _unpackString(data, offset)
+				names.append(shipName)
+
+			board = cls(rows, cols, name=name, sparse=bool(flags & 2), bitboard=bool(flags & 1))
+			shipClasses = {shipClass.__name__: shipClass for shipClass in getShipClasses()}
+			for i in range(nShips):
+				kindIndex, nameIndex, row, col, direction = _shipStruct.unpack_from(data, offset)
+				offset += _shipStruct.size
+				className, shipClass, boardID, length = kinds[kindIndex]
+				ship = None
+				if className in shipClasses:
+					ship = shipClasses[className](names[nameIndex])
+					if (ship.shipClass, ship.boardID, ship.length) != (shipClass, boardID, length):
+						ship = None
+				if ship is None:
+					ship = Ship(names[nameIndex], shipClass, boardID, length)
+				ship.setCoords(ship.getStraightCoords((row, col), "RDLU"[direction]))
+				board.addShip(ship)
+
+			# Replay the shots
+			shots = []
+			hitBytes = (sum(ship.length for ship in board.ships) + 7) // 8
+			hitBits = data[offset:offset + hitBytes]
+			offset += hitBytes
+			bit = 0
+			for ship in board.ships:
+				for coord in ship.coords:
+					if hitBits[bit >> 3] >> (bit & 7) & 1:
+						shots.append(coord.x * cols + coord.y)
+					bit += 1
+
+			encoding = struct.unpack_from("<B", data, offset)[0]
+			offset += 1
+			if encoding == 1:
+				nWater = struct.unpack_from("<Q", data, offset)[0]
+				offset += 8
+				shots.extend(struct.unpack_from("<{}Q".format(nWater), data, offset))
+			elif encoding == 0:
+				waterBytes = (rows * cols + 7) // 8
+				waterBits = data[offset:offset + waterBytes]
+				if len(waterBits) != waterBytes:
+					raise InvalidBoardData("Board data too short")
+				for i, byte in enumerate(waterBits):
+					while byte:
+						lowBit = byte & -byte
+						shots.append(i * 8 + lowBit.bit_length() - 1)
+						byte ^= lowBit
+			else:
+				raise InvalidBoardData("Unknown water encoding {}".format(encoding))
+		except (struct.error, IndexError, ValueError) as e:
+			raise InvalidBoardData("Board data is corrupt ({})".format(e))
+
+		for cell in sorted(shots):
+			board.processFire(divmod(cell, cols))
+		return board
 
 	def __repr__(self):
 		"""
 		Print using custom display method with boardView = 0 and shipView = 0 (god mode)
 
+		Sparse boards only show the window around the latest shot (see
+		display).
+
 		:return: String showing the state of the board
 		"""
 
@@ -227,7 +778,7 @@ class Board(object):
 		return self.display(visible="all", sDisp="type")
 
 
-	def populateBoard(self, ships, random = False, debug = False):
+	def populateBoard(self, ships, random = False):
 		"""
 		Populate a board given a list of ships.
 
@@ -242,58 +793,33 @@ class Board(object):
 
 		for ship in ships:
 			if random:
-				# Place ship randomly by:
-				# Looping through shipmap to find valid origin/direction combos
-				#	- NOTE: This was the original plan - implementation was slightly
-				#	  different.
-				#	- Start at (0,0) loop through each row left to right
-				#	- For each element that has at least (ship.length-1) coords to
-				#	its right, check if they are all -1 (empty).  If they are, store
-				#	[origin,"R"] as a potential placement
-				#	- For each element that has at least (ship.length-1) coords
-				#	below it, check if they are all -1 (empty) and store if true
-				#	- NOTE: I do not look left or up because, as I'm searching from
-				#	top left to bottom right in order, and these would be redundant.
-				#	I THINK this doesn't have any systematic bias, but didn't bother
-				# 	to prove it.
-				#	- Randomly choose one of the valid placements as the ship's
-				#	location, place the ship (catch errors just in case), and move
-				#	to next.
-				#	- If no room for ship, error out(?)
+				# Place ship randomly by picking one of the legal placements
+				# (origin and direction "R" or "D") left for this ship's length
+				# in placementIndex.  Left/up aren't needed as they'd just
+				# repeat right/down placements.  The index is built once per
+				# board (per length) and addShip removes the placements each new
+				# ship blocks, so this doesn't search the board every ship.
+				# Sparse boards have no shipMap to index, see _chooseSparseSpace.
 				print()
 				print("Placing ship {} randomly".format(ship.name))
-				availableSpaces = []
-				# Find all valid places for this ship.
-				for i in range(0, myBoard.rows):
-					for j in range(0, myBoard.cols):
-						if debug == True:
-							print("Checking ({},{})".format(i,j))
-						# Check if this works for the ship placed to the right
-						if checkLineVal(myBoard.shipMap, (i, j), -1, ship.length, (0, 1), False):
-							if debug == True:
-								print("({},{},R) passed!".format(i,j))
-							availableSpaces.append((i, j, "R"))
-						# Check if this works for the ship placed down
-						if checkLineVal(myBoard.shipMap, (i, j), -1, ship.length, (1, 0), False):
-							if debug == True:
-								print("({},{},D) passed!".format(i,j))
-							availableSpaces.append((i, j, "D"))
-				if debug == True:
-					# Display valid spaces
-					print("Ship can be placed randomly within:")
-					print(availableSpaces)
-
-				# Choose one space within available spaces, then place ship
-				if len(availableSpaces) < 1:
+				if self.sparse:
+					space = self._chooseSparseSpace(ship.length)
+				else:
+					if self.placementIndex is None:
+						self.placementIndex = PlacementIndex(self.rows, self.cols, self.shipMap)
+					if _trace.enabled: _trace("populateBoard.spaces", "Ship {} can be placed randomly in {} places", ship.name, self.placementIndex.count(ship.length))
+
+					# Choose one space within available spaces, then place ship
+					space = self.placementIndex.choose(ship.length)
+				if space is None:
 					raise Exception("No valid spaces available for ship {}".format(ship.name))
-				space = randint(0, len(availableSpaces) - 1)
-				if debug == True: print("Trying to place {} at ({},{}) {}".format(ship.name, *availableSpaces[space]))
+				if _trace.enabled: _trace("populateBoard.try", "Trying to place {} at ({},{}) {}", ship.name, *space)
 
-				origin = (availableSpaces[space][0], availableSpaces[space][1])
-				direction = availableSpaces[space][2]
+				origin = (space[0], space[1])
+				direction = space[2]
 				ship.setCoords(ship.getStraightCoords(origin, direction))
-				myBoard.addShip(ship)
-				print("Ship {} placed randomly at ({},{}) {}".format(ship.name, *availableSpaces[space]))
+				self.addShip(ship)
+				print("Ship {} placed randomly at ({},{}) {}".format(ship.name, *space))
 
 			else:
 				while True:
@@ -303,7 +829,7 @@ class Board(object):
 					# Place ship until valid place chosen
 					ship.setCoords(coords = ship.getStraightCoords())
 					try:
-						myBoard.addShip(ship)
+						self.addShip(ship)
 					except InvalidShipPlacement as e:
 						# If something goes wrong, print the exception and ask
 						# for placement again
@@ -315,9 +841,47 @@ class Board(object):
 					# If you get here, the ship is placed!
 					break
 
-			if debug == True:
-				print("Board after placing ship {}: ".format(ship.name))
-				print(myBoard)
+			if _trace.enabled: _trace("populateBoard.placed", "Board {} after placing ship {}:\n{}", self.name, ship.name, self.display("all", "ID", center=ship.coords[0] if self.sparse else None))
+
+	def _chooseSparseSpace(self, length, maxTries = 1000):
+		"""
+		Picks a legal placement for a ship of length at random without looking
+		at the whole board: placements (origin and direction "R" or "D") are
+		picked uniformly from every placement on an empty board until one
+		doesn't overlap a ship.  That is the same distribution as
+		PlacementIndex.choose.  After maxTries misses (a crowded board) every
+		placement is checked instead.
+
+		:param length: Ship length
+		:param maxTries: Random placements to try before checking them all
+		:return: (row, col, direction) or None if the ship doesn't fit anywhere
+		"""
+		rows, cols = self.rows, self.cols
+		nRight = rows * max(cols - length + 1, 0)
+		nDown = max(rows - length + 1, 0) * cols if length > 1 else 0
+		if nRight + nDown == 0:
+			return None
+
+		def space(i):
+			if i < nRight:
+				return (i // (cols - length + 1), i % (cols - length + 1), "R")
+			i -= nRight
+			return (i // cols, i % cols, "D")
+
+		def fits(row, col, direction):
+			dr, dc = (0, 1) if direction == "R" else (1, 0)
+			return not any((row + k * dr, col + k * dc) in self.cellIndex for k in range(length))
+
+		for i in range(maxTries):
+			candidate = space(randint(0, nRight + nDown - 1))
+			if fits(*candidate):
+				return candidate
+
+		if _trace.enabled: _trace("populateBoard.crowded", "No random placement found for length {} in {} tries", length, maxTries)
+		spaces = [space(i) for i in range(nRight + nDown) if fits(*space(i))]
+		if not spaces:
+			return None
+		return spaces[randint(0, len(spaces) - 1)]
 
 	def getHealth(self):
 		"""
@@ -327,20 +891,36 @@ class Board(object):
 					hitsRemaining is the sum of hits remaining for all ships on this board
 					hitsTaken is the sum of hits taken by all ships on this board
 		"""
-		hitsRemaining = 0
-		hitsTaken = 0
-
-		for ship in self.ships:
-			shipHealth = ship.getHealth()
-			hitsRemaining = hitsRemaining + shipHealth["remaining"]
-			hitsTaken = hitsTaken + shipHealth["remaining"]
+		# Totals are kept as ships are added and hit through this board, so
+		# this is O(1) (and misses hits made by calling Ship.takeFire directly).
+		# Bitboard boards count the bits in their masks.
+		if self.bitboard:
+			taken = popcount(self.hitMask)
+			return {"taken": taken, "remaining": popcount(self.occupiedMask) - taken}
+		return {"taken": self.hitsTaken, "remaining": self.shipCells - self.hitsTaken}
+
+	def isDefeated(self):
+		"""
+		Returns True if there are no hits remaining on any ship on the board.  O(1)
+		(one mask compare for bitboard boards).
+		"""
+		if self.bitboard:
+			return self.hitMask == self.occupiedMask
+		return self.hitsTaken == self.shipCells
 
-		return {"taken": hitsTaken, "remaining": hitsRemaining}
+	def isSunk(self, shipIndex):
+		"""
+		Returns True if ships[shipIndex] has been sunk.  O(1).
+		"""
+		if self.bitboard:
+			shipMask = self.shipMasks[shipIndex]
+			return self.hitMask & shipMask == shipMask
+		return self.ships[shipIndex].isSunk()
 
 	# addShip method accepts an existing ship class and adds it to the board.
 	# The method also checks to make sure the ship is on the board and does not
 	# does not overlap with any existing ships
-	def addShip(self, ship, debug = False):
+	def addShip(self, ship):
 		"""
 		Accepts a Ship object and adds it to the board, checking whether ship placement is valid (on board, no overlap)
 
@@ -353,33 +933,31 @@ class Board(object):
 		if (not isinstance(ship, Ship)):
 			raise InvalidShip("Invalid input to addShip - must be Ship class")
 
-		if debug == True:
-			print("Adding ship {} to board {}".format(ship.name, self.name))
-			print("Board {} shipMap started as:".format(self.name))
-			print(self.shipMap)
+		# Get our own copy of the layout if it is shared with a clone
+		if self._sharedLayout:
+			self._ownLayout()
+
+		if _trace.enabled: _trace("addShip", "Adding ship {} to board {} at {}", ship.name, self.name, tuple(ship.coords))
 
 		# Check ship for valid position (fully on map, not on other ships, etc.)
-		# Loop through each position to check validity.  Store local copy of
-		# shipMap, then update this local copy with each coordinate as you
-		# test them.  If all coordinates are valid, set shipMap=tempShipMap
-		#
-		# This way we don't loop through the coords twice (one to test, one to set)!
+		# This is done in two passes: first check every coordinate without
+		# touching the board, then (only if they all pass) write the ship into
+		# shipMap.  A failed placement therefore leaves the board unchanged, and
+		# the work done is proportional to the ship length rather than the
+		# board size.
 
-		# Make a deepcopy of shipMap to work on locally (need deepcopy because
-		# shipMap is a mutable object of mutable objects
-		tempShipMap = copy.deepcopy(self.shipMap)
+		if self.bitboard:
+			self._addShipMasks(ship)
+			return
 
 		# Determine next available ship index.  Store for use
 		nextShipIndex = len(self.ships)
 
-		# Loop through ship's coordinates, checking if they're valid/free
-		# and if so placing the ship on them.
-		# This gets complicated because ship.coords are in a 0 index system,
-		# but the board was stored in a 1 index system.  Need to make this
-		# easier...
+		# Loop through ship's coordinates, checking if they're valid/free.
+		# shipCells holds the cells checked so far so a ship that overlaps
+		# itself is also caught.
+		shipCells = set()
 		for coord in ship.coords:
-			if debug == True:
-				print("Trying to place ship {} at coord {}".format(ship.name, coord))
 			# Check if row is inside board
 			if (coord.x < 0 or coord.x >= self.rows):
 				raise InvalidShipPlacement("New ship {0} must be within board".format(ship.name, self.rows - 1))
@@ -387,37 +965,94 @@ class Board(object):
 			elif (coord.y < 0 or coord.y >= self.cols):
 				raise InvalidShipPlacement("New ship {0} must be within board".format(ship.name, self.cols - 1))
 			# Check if coordinate is already taken
-			# TODO: Is there another way for this? Not sure if this actually works. And shipMap hasn't been used much elsewhere
-			# TODO: Check if placing overlaping ships raises error like it should
-			elif tempShipMap[coord.x][coord.y] >= 0:
-				overlapShipNum = tempShipMap[coord.x][coord.y]
+			elif (coord.x, coord.y) in self.cellIndex:
+				overlapShipNum = self.cellIndex[(coord.x, coord.y)][0]
 				overlapShipName = self.ships[overlapShipNum].name
 				raise InvalidShipPlacement("New ship {0} overlaps previous ship {1} (ID: {2})".format(ship.name, overlapShipName,
 				                                                                           overlapShipNum))
-			# If nothing went wrong, place this pip of the ship.
-			else:
-				if debug == True:
-					print("\tPassed all checks - ship fits!")
-					print("\tupdating coord {}".format(coord))
-					print("\tshipMap was {}".format(tempShipMap[coord.x][coord.y]))
-				tempShipMap[coord.x][coord.y] = nextShipIndex
-				if debug == True:
-					print("\tshipMap now {}".format(tempShipMap[coord.x][coord.y]))
+			elif coord in shipCells:
+				raise InvalidShipPlacement("New ship {0} overlaps itself at {1}".format(ship.name, coord))
+			shipCells.add(coord)
 
 		# If we get here, all coordinates worked.  Add ship to .ships and
-		# move the local copy of shipMap (tempShipMap) back to the big time
+		# place each pip of the ship in shipMap
 		self.ships.append(ship)
-		self.shipMap = copy.deepcopy(tempShipMap)
-		if debug == True:
-			print("Addship complete.  Board {} shipMap is now:".format(self.name))
-			print(self.shipMap)
+		self.shipCells += ship.length
+		self.hitsTaken += ship.hitsTaken
+		if self.shipMap is not None:
+			for coord in ship.coords:
+				self.shipMap[coord.x][coord.y] = nextShipIndex
+		self._indexShip(nextShipIndex)
+		if self.placementIndex is not None:
+			self.placementIndex.invalidate(ship.coords)
+		if self._renderCache:
+			self._markDirty(ship.coords)
+		if self._subscribers:
+			self._emit("place", None, nextShipIndex)
+		if _trace.enabled: _trace("addShip.done", "Ship {} added to board {} as ship {}", ship.name, self.name, nextShipIndex)
+
+	def _addShipMasks(self, ship):
+		"""
+		Bitboard version of addShip.  Builds the ship's mask, checking each
+		coordinate against the board edges and the ship's own cells, tests it
+		against occupiedMask in one go and only then commits the mask (and
+		shipMap) to the board.
+
+		:param ship: A Ship object with coordinates defined
+		:return: Nothing, but updates .ships, .shipMasks, .occupiedMask and .shipMap
+		"""
+		nextShipIndex = len(self.ships)
+		shipMask = 0
+		hitMask = 0
+		for coord, hit in zip(ship.coords, ship.hits):
+			if (coord.x < 0 or coord.x >= self.rows or coord.y < 0 or coord.y >= self.cols):
+				raise InvalidShipPlacement("New ship {0} must be within board".format(ship.name))
+			bit = cellBit(coord.x, coord.y, self.cols)
+			if shipMask & bit:
+				raise InvalidShipPlacement("New ship {0} overlaps itself at {1}".format(ship.name, coord))
+			shipMask |= bit
+			# Ships may arrive with hits already recorded
+			if hit:
+				hitMask |= bit
+
+		overlap = shipMask & self.occupiedMask
+		if overlap:
+			# Name the ship in the first cell that overlaps
+			overlapShipNum = self.cellIndex[divmod(next(iterBits(overlap)), self.cols)][0]
+			overlapShipName = self.ships[overlapShipNum].name
+			raise InvalidShipPlacement("New ship {0} overlaps previous ship {1} (ID: {2})".format(ship.name, overlapShipName,
+			                                                                           overlapShipNum))
+
+		# All coordinates worked - commit
+		self.ships.append(ship)
+		self.shipMasks.append(shipMask)
+		self.occupiedMask |= shipMask
+		self.hitMask |= hitMask
+		for coord in ship.coords:
+			self.shipMap[coord.x][coord.y] = nextShipIndex
+		self._indexShip(nextShipIndex)
+		if self.placementIndex is not None:
+			self.placementIndex.invalidate(ship.coords)
+		if self._renderCache:
+			self._markDirty(ship.coords)
+		if self._subscribers:
+			self._emit("place", None, nextShipIndex)
+		if _trace.enabled: _trace("addShip.done", "Ship {} added to board {} as ship {}", ship.name, self.name, nextShipIndex)
+
+	def _indexShip(self, shipIndex):
+		"""
+		Adds the cells of ships[shipIndex] to cellIndex
 
+		:param shipIndex: Index of an already placed ship in .ships
+		:return: Nothing, but updates .cellIndex
+		"""
+		for segment, coord in enumerate(self.ships[shipIndex].coords):
+			self.cellIndex[(coord.x, coord.y)] = (shipIndex, segment)
 
-	def interactiveFire(self, debug = False):
+	def interactiveFire(self):
 		"""
 		Provides a text prompt to the user for firing.  Continues to loop until valid shot registered.
 
-		:param debug:
 		:return:
 		"""
 		print("Firing on board {}:".format(self.name))
@@ -426,40 +1061,29 @@ class Board(object):
 		print("Where would you like to fire?")
 
 		# Continue taking targets until a valid one is entered
-		# TODO: Update this with Coord object's method
 		while True:
 			# Get coord from user through screen prompt
 			coord = Coord()
 
-			try:
-				hitIndex = self.processFire(coord)
-			except FireOutsideBoard as e:
+			outcome = self.fire(coord)
+			if outcome.result == ShotResult.OUTSIDE:
 				print("Invalid shot - {} is not on the board".format(coord))
-				if debug == True:
-					print(str(e))
 				continue
-			except HitDuplicate as e:
+			elif outcome.result == ShotResult.DUPLICATE:
 				print("Invalid shot - {} has already been hit".format(coord))
-				if debug == True:
-					print(str(e))
 				continue
 
-			# Check to see how the shot turned out
-			# -1 indicates no hits
-			if hitIndex == -1:
+			# Check to see how the shot turned out.  Broadcast the identity
+			# of a ship that was sunk
+			if outcome.result == ShotResult.MISS:
 				print("Miss!")
-				break
+			elif outcome.result == ShotResult.HIT:
+				print("HIT!  You've hit an unknown ship.")
 			else:
-				# Check the health of the ship that was hit.  Broadcast
-				# identity if sunk
-				shipHealth = self.ships[hitIndex].getHealth()
-				if shipHealth["remaining"] > 0:
-					print("HIT!  You've hit an unknown ship.")
-				else:
-					print("You've hit and sunk {}!".format(self.ships[hitIndex].name))
-				break
+				print("You've hit and sunk {}!".format(outcome.ship.name))
+			break
 
-	def processFire(self, fireCoord, debug=False):
+	def processFire(self, fireCoord):
 		"""
 		Accepts a Coord object or tuple of the coordinate that is being shot at, determines if there is a ship at that coordinate, and updates the ship/water hits accordingly.
 
@@ -477,53 +1101,338 @@ class Board(object):
 
 		# Algorithm:
 		#	-	Check if fire is within board.  Raise error if it isn't.
-		#	-	Loop through ships and check if any are hit.
-		#		-	If hit is new, return index
+		#	-	Record the shot with _fireAt, which looks up the ship (if any)
+		#		at the coord in cellIndex, or the water hits.
+		#		-	If hit is new, return index (or -1 for water)
 		#		-	If hit is a repeat, raise an exception
-		#	-	Check water to find repeat shot
-		#		-	If shot is new, return -1
-		#		-	If shot is a repeat, raise an exception
-
-		if debug == True:
-			print("Board {} taking fire at coord {}".format(self.name, fireCoord))
 
-		# Convert fireCoord to Coord object if necessary, or make a copy of the input fireCoord.
-		if not isinstance(fireCoord, Coord):
-			fireCoord = Coord(fireCoord)
-		else:
-			fireCoord = copy.deepcopy(fireCoord)
+		# Convert fireCoord to Coord object if necessary (Coords are immutable
+		# and interned, so no copy is needed)
+		fireCoord = Coord(fireCoord)
+		if _trace.enabled: _trace("processFire", "Board {} taking fire at coord {}", self.name, fireCoord)
 
 		# Check if fireCoord is within board
 		if (fireCoord.x >= self.rows or fireCoord.x < 0 or fireCoord.y >= self.cols or fireCoord.y < 0):
 			message = "{} is outside board ({} rows, {} cols)".format(fireCoord, self.rows, self.cols)
 			raise FireOutsideBoard(message)
-		hitany = -1
-
-		# Loop through ships to see if any are hit
-		for i, ship in enumerate(self.ships):
-			try:
-				# ship.processFire returns the ship's index that was hit if a hit,
-				# otherwise it returns -1 for a miss or an exception if this shot
-				# is redundant
-				hitthis = ship.takeFire(fireCoord)
-			# If ship has already been hit here, raise exception
-			except HitDuplicate:
-				raise HitDuplicate("Board hit with redundant shot on ship {} ({})".format(ship.name, i))
-
-			# Record the ship that was hit
-			if hitthis >= 0:
-				hitany = i
-				break
+
+		# Stop sharing the hit state with clones before changing it
+		if self._hitSharers is not None:
+			self._ownHits()
+
+		hitIndex = self._fireAt(fireCoord)
+		if hitIndex == _duplicateShot:
+			shipSegment = self.cellIndex.get((fireCoord.x, fireCoord.y))
+			if shipSegment is None:
+				raise HitDuplicate("Board hit with redundant shot in water")
+			raise HitDuplicate("Board hit with redundant shot on ship {} ({})".format(self.ships[shipSegment[0]].name, shipSegment[0]))
+		return hitIndex
+
+	def fire(self, fireCoord):
+		"""
+		Fires at fireCoord and says what happened, without raising exceptions
+		for shots that are off the board or already fired at.  Otherwise the
+		same as processFire.
+
+		:param fireCoord: Coord object or tuple of (x,y) coordinate to attempt to hit
+		:return: FireOutcome
+		"""
+		fireCoord = Coord(fireCoord)
+		if (fireCoord.x >= self.rows or fireCoord.x < 0 or fireCoord.y >= self.cols or fireCoord.y < 0):
+			return FireOutcome(ShotResult.OUTSIDE, -1, None, fireCoord)
+
+		if self._hitSharers is not None:
+			self._ownHits()
+
+		return self._fireOutcome(fireCoord, self._fireAt(fireCoord))
+
+	def fireMany(self, coords):
+		"""
+		Fires a salvo: every coordinate in coords, in order, in one call.  Like
+		fire, nothing is raised for shots that are off the board or already
+		fired at (including earlier in the same salvo), and the usual board
+		events are sent for each shot.
+
+		The ships sunk by the salvo, and whether it defeated the board, are
+		also reported once for the whole salvo.
+
+		Every coordinate is checked before any shot is fired, so if one isn't
+		a valid coordinate ValueError is raised and the board is unchanged.
+
+		:param coords: Iterable of Coord objects or (x,y) tuples
+		:return: SalvoResult
+		"""
+		coords = [Coord(fireCoord) for fireCoord in coords]
+
+		if self._hitSharers is not None:
+			self._ownHits()
+
+		rows, cols = self.rows, self.cols
+		fireAt = self._fireAt
+		fireOutcome = self._fireOutcome
+		outcomes = []
+		sunk = []
+		for fireCoord in coords:
+			if (fireCoord.x >= rows or fireCoord.x < 0 or fireCoord.y >= cols or fireCoord.y < 0):
+				outcomes.append(FireOutcome(ShotResult.OUTSIDE, -1, None, fireCoord))
+				continue
+
+			outcome = fireOutcome(fireCoord, fireAt(fireCoord))
+			if outcome.result == ShotResult.SUNK or outcome.result == ShotResult.DEFEATED:
+				sunk.append(outcome.shipIndex)
+			outcomes.append(outcome)
+
+		if _trace.enabled: _trace("fireMany", "Board {} salvo of {} shots sunk {}", self.name, len(outcomes), tuple(sunk))
+		return SalvoResult(outcomes, sunk, bool(sunk) and self.isDefeated())
+
+	def _fireOutcome(self, fireCoord, hitIndex):
+		"""
+		Returns the FireOutcome of a shot at fireCoord (on the board) that has
+		just been fired, given _fireAt's return value
+		"""
+		if hitIndex == _duplicateShot:
+			shipSegment = self.cellIndex.get((fireCoord.x, fireCoord.y))
+			if shipSegment is None:
+				return FireOutcome(ShotResult.DUPLICATE, -1, None, fireCoord)
+			return FireOutcome(ShotResult.DUPLICATE, shipSegment[0], self.ships[shipSegment[0]], fireCoord)
+		if hitIndex < 0:
+			return FireOutcome(ShotResult.MISS, -1, None, fireCoord)
+		return FireOutcome(self.shotResult(hitIndex), hitIndex, self.ships[hitIndex], fireCoord)
+
+	def shotResult(self, hitIndex):
+		"""
+		Returns the ShotResult of a shot that has just been fired, given
+		processFire's return value
+
+		:param hitIndex: Index of the ship hit, or -1 for a miss
+		:return: ShotResult (MISS, HIT, SUNK or DEFEATED)
+		"""
+		if hitIndex < 0:
+			return ShotResult.MISS
+		if not self.isSunk(hitIndex):
+			return ShotResult.HIT
+		if self.isDefeated():
+			return ShotResult.DEFEATED
+		return ShotResult.SUNK
+
+	def _fireAt(self, fireCoord):
+		"""
+		Records a shot at fireCoord.  Nothing is raised, and nothing changes
+		for a cell that was already fired at.
+
+		:param fireCoord: Coord object within the board (with the hit state
+						  already our own - see _ownHits)
+		:return: Index of the ship hit, -1 for a miss or _duplicateShot
+		"""
+		if self.bitboard:
+			return self._fireAtMasks(fireCoord)
+
+		# Look up which ship (if any) is at fireCoord
+		shipSegment = self.cellIndex.get((fireCoord.x, fireCoord.y))
+		if shipSegment is not None:
+			hitany, segment = shipSegment
+			ship = self.ships[hitany]
+			if ship.hits[segment]:
+				return _duplicateShot
+			# Finish updating the ship and the board before sending any
+			# events, so callbacks see the board as it is after the shot
+			ship.markHit(segment, notify=False)
+			self.hitsTaken += 1
+			self.shotHistory.append((fireCoord, hitany))
+			if self._renderCache:
+				self._markShotDirty(fireCoord, hitany)
+			if ship._subscribers:
+				ship._emitHit(segment)
+			if self._subscribers:
+				self._emitShot(fireCoord, hitany)
+			return hitany
 
 		# No ship hit - check water to see if it is new or redundant and act
 		# accordingly
-		if hitany == -1:
-			if fireCoord in self.waterhits:
-				raise HitDuplicate("Board hit with redundant shot in water")
+		if fireCoord in self.waterhits:
+			return _duplicateShot
+		self.waterhits.add(fireCoord)
+		self.shotHistory.append((fireCoord, -1))
+		if self._renderCache:
+			self._markShotDirty(fireCoord, -1)
+		if self._subscribers:
+			self._emit("miss", fireCoord, -1)
+		return -1
+
+	def _fireAtMasks(self, fireCoord):
+		"""
+		Bitboard version of _fireAt.  The hit and duplicate tests are mask
+		tests, and the shot is recorded by setting its bit in hitMask or
+		waterMask.
+
+		:param fireCoord: Coord object within the board
+		:return: See _fireAt
+		"""
+		bit = cellBit(fireCoord.x, fireCoord.y, self.cols)
+
+		if self.occupiedMask & bit:
+			if self.hitMask & bit:
+				return _duplicateShot
+			hitany, segment = self.cellIndex[(fireCoord.x, fireCoord.y)]
+			ship = self.ships[hitany]
+			ship.markHit(segment, notify=False)
+			self.hitMask |= bit
+			self.shotHistory.append((fireCoord, hitany))
+			if self._renderCache:
+				self._markShotDirty(fireCoord, hitany)
+			if ship._subscribers:
+				ship._emitHit(segment)
+			if self._subscribers:
+				self._emitShot(fireCoord, hitany)
+			return hitany
+
+		if self.waterMask & bit:
+			return _duplicateShot
+		self.waterMask |= bit
+		self.shotHistory.append((fireCoord, -1))
+		if self._renderCache:
+			self._markShotDirty(fireCoord, -1)
+		if self._subscribers:
+			self._emit("miss", fireCoord, -1)
+		return -1
+
+	def applyShot(self, fireCoord):
+		"""
+		Fires at fireCoord in a way that can be taken back with undoShot.  This
+		is just processFire (every shot recorded in shotHistory can be undone),
+		named to pair with undoShot for search code.
+
+		:param fireCoord: Coord object or tuple of (x,y) coordinate to attempt to hit
+		:return: See processFire
+		"""
+		return self.processFire(fireCoord)
+
+	def undoShot(self):
+		"""
+		Takes back the most recent shot in shotHistory, restoring the ship hit
+		(and so its sunk status) or water hit as it was before the shot.  O(1).
+
+		Raises NothingToUndo if no shots have been fired.
+
+		:return: The (Coord, hitIndex) entry that was removed from shotHistory
+		"""
+		if len(self.shotHistory) == 0:
+			raise NothingToUndo("No shots on board {} to undo".format(self.name))
+		if self._hitSharers is not None:
+			self._ownHits()
+
+		# Mark cells as changed before the hit goes, so that a ship that was
+		# sunk gets all of its cells re-rendered
+		fireCoord, hitIndex = self.shotHistory[-1]
+		if self._renderCache:
+			self._markShotDirty(fireCoord, hitIndex)
+
+		entry = self.shotHistory.pop()
+		if hitIndex >= 0:
+			segment = self.cellIndex[(fireCoord.x, fireCoord.y)][1]
+			ship = self.ships[hitIndex]
+			ship.clearHit(segment, notify=False)
+			if self.bitboard:
+				self.hitMask &= ~cellBit(fireCoord.x, fireCoord.y, self.cols)
 			else:
-				self.waterhits.append(fireCoord)
+				self.hitsTaken -= 1
+			if ship._subscribers:
+				ship._emit("undo", segment)
+		elif self.bitboard:
+			self.waterMask &= ~cellBit(fireCoord.x, fireCoord.y, self.cols)
+		else:
+			self.waterhits.discard(fireCoord)
+		if self._subscribers:
+			self._emit("undo", fireCoord, hitIndex)
+		return entry
+
+	@contextlib.contextmanager
+	def tryShot(self, fireCoord):
+		"""
+		Context manager that applies a shot for the duration of a with block
+		and then undoes it:
+			with board.tryShot((3, 4)) as hitIndex:
+				... evaluate the board ...
+
+		Any shots applied inside the block must be undone inside it too.
+
+		:param fireCoord: Coord object or tuple of (x,y) coordinate to attempt to hit
+		:return: Context manager giving processFire's return value
+		"""
+		hitIndex = self.applyShot(fireCoord)
+		try:
+			yield hitIndex
+		finally:
+			self.undoShot()
+
+	def subscribe(self, event, callback):
+		"""
+		Calls callback(board, event, coord, shipIndex) every time event
+		happens on this board, after the board has been updated.  Events are:
+			"place" - a ship was added (coord is None)
+			"miss" - a shot hit water (shipIndex is -1)
+			"hit" - a shot hit a ship
+			"sunk" - a shot sunk a ship (after its "hit")
+			"defeated" - a shot sunk the last ship (after its "sunk")
+			"undo" - undoShot took back a shot (shipIndex is -1 for water)
+		Duplicate and off-board shots change nothing, so send no events.
+
+		:param event: One of the event names above
+		:param callback: Callable taking (board, event, coord, shipIndex)
+		:return: Nothing
+		"""
+		if event not in boardEvents:
+			raise ValueError("Unknown board event \"{}\" (expected one of {})".format(event, ", ".join(boardEvents)))
+		self._subscribers[event] = self._subscribers.get(event, ()) + (callback,)
 
-		return hitany
+	def unsubscribe(self, event, callback):
+		"""
+		Stops calling callback for event (see subscribe)
+
+		:param event: Event name callback was subscribed to
+		:param callback: Callable given to subscribe
+		:return: Nothing
+		"""
+		callbacks = list(self._subscribers.get(event, ()))
+		if callback not in callbacks:
+			raise ValueError("Callback is not subscribed to board event \"{}\"".format(event))
+		callbacks.remove(callback)
+		if callbacks:
+			self._subscribers[event] = tuple(callbacks)
+		else:
+			del self._subscribers[event]
+
+	def _emit(self, event, coord, shipIndex):
+		"""
+		Calls every subscriber to event
+		"""
+		for callback in self._subscribers.get(event, ()):
+			callback(self, event, coord, shipIndex)
+
+	def _emitShot(self, fireCoord, shipIndex):
+		"""
+		Sends the events for a new hit on ships[shipIndex]
+		"""
+		self._emit("hit", fireCoord, shipIndex)
+		if self.isSunk(shipIndex):
+			self._emit("sunk", fireCoord, shipIndex)
+			if self.isDefeated():
+				self._emit("defeated", fireCoord, shipIndex)
+
+	def isFired(self, coord):
+		"""
+		Returns True if the board has already been shot at coord (ship or water)
+
+		:param coord: Coord object or tuple of (x,y) coordinate
+		:return: Boolean
+		"""
+		coord = Coord(coord)
+		if self.bitboard:
+			return bool((self.hitMask | self.waterMask) & cellBit(coord.x, coord.y, self.cols))
+		shipSegment = self.cellIndex.get((coord.x, coord.y))
+		if shipSegment is not None:
+			return self.ships[shipSegment[0]].hits[shipSegment[1]]
+		return coord in self.waterhits
 
 	###########################
 	# Properties
@@ -558,6 +1467,102 @@ class Board(object):
 ###########################
 # Helper Functions
 ###########################
+# Binary format used by Board.toBytes/fromBytes
+_bytesMagic = b"BSHP"
+_bytesVersion = 1
+# magic, version, flags, rows, cols, nShips, nKinds, nNames
+_headerStruct = struct.Struct("<4sBBIIIHI")
+# kind index, name index, origin row, origin col, direction
+_shipStruct = struct.Struct("<HIIIB")
+
+def _packString(text):
+	"""
+	Packs a string as a 2 byte length followed by its UTF-8 bytes
+	"""
+	encoded = str(text).encode("utf-8")
+	return struct.pack("<H", len(encoded)) + encoded
+
+def _unpackString(data, offset):
+	"""
+	Reads a string packed by _packString
+
+	:return: (string, offset just past the string)
+	"""
+	length = struct.unpack_from("<H", data, offset)[0]
+	offset += 2
+	text = bytes(data[offset:offset + length])
+	if len(text) != length:
+		raise InvalidBoardData("Board data too short")
+	return (text.decode("utf-8"), offset + length)
+
+def _shipDirection(ship):
+	"""
+	Returns the direction (0-3 for R/D/L/U) a straight ship points from its
+	first coordinate.  Raises InvalidBoardData if the ship isn't straight.
+	"""
+	coords = ship.coords
+	if len(coords) == 1:
+		return 0
+	delta = (coords[1].x - coords[0].x, coords[1].y - coords[0].y)
+	directions = {(0, 1): 0, (1, 0): 1, (0, -1): 2, (-1, 0): 3}
+	if not delta in directions or any(coord.x != coords[0].x + i * delta[0] or coord.y != coords[0].y + i * delta[1]
+	                                  for i, coord in enumerate(coords)):
+		raise InvalidBoardData("Ship {} is not a straight line and can't be packed".format(ship.name))
+	return directions[delta]
+
+# Cache for makeBorders, keyed by (rows, cols)
+_borderCache = {}
+
+# Most borders kept in _borderCache.  Viewports (see Board.display) can ask
+# for many different windows, so the cache is emptied when it gets this big.
+_borderCacheSize = 64
+
+def makeBorders(rows, cols, rowStart = 0, colStart = 0):
+	"""
+	Returns the header and sider used by Board.display for a board size (or
+	a window of rows x cols starting at row rowStart, column colStart), as
+	strings.  They are only built (with makeHeader) the first time each size
+	is asked for.
+
+	:param rows: Number of rows on the board
+	:param cols: Number of columns on the board
+	:param rowStart: Label of the first row
+	:param colStart: Label of the first column
+	:return: (headerLines, siders), where:
+				headerLines is a list of the header lines (already shifted
+				over by the width of the sider)
+				siders is a list of the sider string for each row
+	"""
+	key = (rows, cols, rowStart, colStart)
+	try:
+		return _borderCache[key]
+	except KeyError:
+		pass
+
+	headerLst = makeHeader(range(colStart, colStart + cols), spacer='-')
+	sider = lstTranspose(makeHeader(range(rowStart, rowStart + rows), spacer='|'))
+
+	# Top with header, but shift header over by width of sider to align properly
+	headerLines = [" " * len(sider[0]) + "".join(row) for row in headerLst]
+	siders = ["".join(row) for row in sider]
+
+	if len(_borderCache) >= _borderCacheSize:
+		_borderCache.clear()
+	_borderCache[key] = (headerLines, siders)
+	return (headerLines, siders)
+
+def _clipRange(span, length, name):
+	"""
+	Returns span ((start, stop) as for range(), or None for everything)
+	clipped to [0, length).  Raises ValueError if nothing is left.
+	"""
+	if span is None:
+		return (0, length)
+	start, stop = max(span[0], 0), min(span[1], length)
+	if start >= stop:
+		raise ValueError("{} {} doesn't overlap the board (0 to {})".format(name, tuple(span), length))
+	return (start, stop)
+
 def makeHeader(headings, spacer = None, empty = " "):
 	"""
 	Generate a header with each element of heading printed vertically in a column.
@@ -615,7 +1620,7 @@ def lstTranspose(lst):
 
 
 
-def checkLineVal(array, coord, value, num=0, incr=(1,0), debug = False):
+def checkLineVal(array, coord, value, num=0, incr=(1,0)):
 	"""
 	Subroutine checks if "coord" (format (i,j)) and its "num" neighbours, each
 	spaced by "incr" (which is also in (delta_i,delta_j) format) in
@@ -625,19 +1630,18 @@ def checkLineVal(array, coord, value, num=0, incr=(1,0), debug = False):
 	:param value: Value to check for at each element
 	:param num: Number of increments to check at from coord (num=0 checks only coord)
 	:param incr: Increment to jump for each check (incr=(3,-2) would move down three rows and left two columns)
-	:param debug: Debug printing
 	:return:
 	"""
-	if debug == True: print("Check if coord ({},{}) == {}, num = {}, incr = ({},{})".format(coord[0],coord[1],value,num,incr[0],incr[1]))
+	if _trace.enabled: _trace("checkLineVal", "Check if coord ({},{}) == {}, num = {}, incr = ({},{})", coord[0], coord[1], value, num, incr[0], incr[1])
 
 	if coord[0] < 0 or coord[0] >= len(array):
-		if debug == True: print("coord[0] outside row bounds of array")
+		if _trace.enabled: _trace("checkLineVal.outside", "coord[0] outside row bounds of array")
 		return 0
 	elif coord[1] < 0 or coord[1] >= len(array[0]):
-		if debug == True: print("coord[1] outside row bounds of array")
+		if _trace.enabled: _trace("checkLineVal.outside", "coord[1] outside row bounds of array")
 		return 0
 	elif num > 0:
-		if array[coord[0]][coord[1]] == value and checkLineVal(array, (coord[0]+incr[0], coord[1]+incr[1]), value, num-1, incr, debug):
+		if array[coord[0]][coord[1]] == value and checkLineVal(array, (coord[0]+incr[0], coord[1]+incr[1]), value, num-1, incr):
 			return 1
 		else:
 			return 0
@@ -689,6 +1693,22 @@ class FireOutsideBoard(Exception):
 	def __str__(self):
 		return repr(self.value)
 
+# Exception for board data that can't be packed/unpacked by toBytes/fromBytes
+class InvalidBoardData(Exception):
+	def __init__(self, value):
+		self.value = value
+
+	def __str__(self):
+		return repr(self.value)
+
+# Exception for undoShot with no shots to undo
+class NothingToUndo(Exception):
+	def __init__(self, value):
+		self.value = value
+
+	def __str__(self):
+		return repr(self.value)
+
 
 ###########################
 # Test code for the methods
@@ -782,7 +1802,7 @@ if __name__ == '__main__':
 	# print(myBoard)
 	# print()
 	# for ships in someShips:
-	# 	myBoard.populateBoard(ships, debug=True)
+	# 	myBoard.populateBoard(ships)
 	# 	print("Board is now: ")
 	# 	print(myBoard)
 	# 	print()
@@ -804,7 +1824,7 @@ if __name__ == '__main__':
 		print("Making player {}".format(i))
 		players.append(Player("Player {}".format(i)))
 		print("Adding board to player {}".format(i))
-		players[-1].setBoard(copy.deepcopy(myBoard))
+		players[-1].setBoard(myBoard.clone())
 
 	print("Assigning opponents to players")
 	players[0].setOpponent(players[1])
@@ -818,5 +1838,5 @@ if __name__ == '__main__':
 		print(player)
 		print()
 
-	while players[0].opponent.board.getHealth()["remaining"] > 0:
+	while not players[0].opponent.board.isDefeated():
 		players[0].fire()
\ No newline at end of file
@@ -0,0 +1,277 @@
+import numpy as np
+
+from Board import Board
+from bitMask import cellBit, iterCells
+from layoutGenerator import generateLayouts, layoutToShips
+from Ship import shipType2Ship
+from ShotResult import ShotResult
+
+
+# Outcome given by BoardBatch.fire to boards that were already finished
+NO_SHOT = -1
+
+
+################################################################################
+# BoardBatch class
+################################################################################
+class BoardBatch(object):
+	"""
+	N boards of the same size and fleet held as stacked NumPy arrays, so a
+	shot at every board can be resolved in one vectorized call (eg to step
+	many reinforcement learning games in lockstep).
+
+	Boards follow the same rules as Board: ships are the usual Ship classes,
+	layouts come from layoutGenerator (the same placement rule as
+	Board.populateBoard) or from existing Boards (fromBoards), and a shot is a
+	miss, hit, sink, defeat, duplicate or off the board as in Board.fire.
+
+	Arrays (N boards, cells numbered row-major as in bitMask.cellBit):
+		shipIds - (N, rows, cols) int16 index of the ship in each cell, or -1
+		hits - (N, rows, cols) bool, ship cells that have been hit
+		water - (N, rows, cols) bool, water cells that have been fired at
+		shipLengths - (N, nShips) length of each ship
+		shipHits - (N, nShips) number of hits on each ship
+		remaining - (N,) ship cells not yet hit on each board
+		done - (N,) True for boards whose fleet has been sunk
+	"""
+
+	# Default reward for each ShotResult (see fire)
+	defaultRewards = {ShotResult.MISS: 0.0,
+	                  ShotResult.HIT: 1.0,
+	                  ShotResult.SUNK: 1.0,
+	                  ShotResult.DEFEATED: 1.0,
+	                  ShotResult.DUPLICATE: -1.0,
+	                  ShotResult.OUTSIDE: -1.0}
+
+	def __init__(self, nBoards, rows, cols, fleet, seed = None, rewards = None):
+		"""
+		:param nBoards: Number of boards
+		:param rows: Number of rows on each board
+		:param cols: Number of columns on each board
+		:param fleet: List of Ship subclasses or the names of Ship subclasses
+					  (as for shipType2Ship) placed on every board
+		:param seed: (Optional) Seed for the random ship layouts
+		:param rewards: (Optional) Dictionary of ShotResult to reward, used to
+						update defaultRewards
+		"""
+		self.rows = rows
+		self.cols = cols
+		self.fleet = list(fleet)
+		self.nShips = len(self.fleet)
+
+		rewardTable = dict(self.defaultRewards)
+		if rewards is not None:
+			rewardTable.update(rewards)
+		# Indexed by outcome + 1, so NO_SHOT (-1) is the first entry
+		self.rewardTable = np.array([0.0] + [rewardTable[result] for result in sorted(ShotResult)])
+
+		self.shipIds = np.full((nBoards, rows, cols), -1, dtype=np.int16)
+		self.hits = np.zeros((nBoards, rows, cols), dtype=bool)
+		self.water = np.zeros((nBoards, rows, cols), dtype=bool)
+		lengths = [ship.length for ship in shipType2Ship(shipTypes=self.fleet)]
+		self.shipLengths = np.tile(np.array(lengths, dtype=np.int32), (nBoards, 1))
+		self.shipHits = np.zeros((nBoards, self.nShips), dtype=np.int32)
+		self.remaining = np.full(nBoards, sum(lengths), dtype=np.int32)
+		self.done = np.zeros(nBoards, dtype=bool)
+
+		# Ship masks of each board (see layoutGenerator), kept for toBoard
+		self.layouts = [None] * nBoards
+		self.layoutSource = generateLayouts(rows, cols, self.fleet, seed=seed, count=None)
+		self.reset()
+
+	@classmethod
+	def fromBoards(cls, boards, rewards = None):
+		"""
+		Makes a BoardBatch holding the current state (ships and shots) of
+		existing Boards.  The boards must all be the same size with the same
+		classes of ship in the same order.  reset() gives them new random
+		layouts of that fleet.
+
+		:param boards: List of Boards
+		:param rewards: (Optional) See BoardBatch
+		:return: BoardBatch
+		"""
+		first = boards[0]
+		fleet = [type(ship) for ship in first.ships]
+		for board in boards:
+			if (board.rows, board.cols) != (first.rows, first.cols):
+				raise ValueError("Board {} is {}x{}, expected {}x{}".format(board.name, board.rows, board.cols,
+				                                                           first.rows, first.cols))
+			if [type(ship) for ship in board.ships] != fleet:
+				raise ValueError("Board {} has a different fleet from board {}".format(board.name, first.name))
+
+		batch = cls(0, first.rows, first.cols, fleet, rewards=rewards)
+		n = len(boards)
+		batch.shipIds = np.full((n, batch.rows, batch.cols), -1, dtype=np.int16)
+		batch.hits = np.zeros((n, batch.rows, batch.cols), dtype=bool)
+		batch.water = np.zeros((n, batch.rows, batch.cols), dtype=bool)
+		batch.shipLengths = np.zeros((n, batch.nShips), dtype=np.int32)
+		batch.shipHits = np.zeros((n, batch.nShips), dtype=np.int32)
+		batch.remaining = np.zeros(n, dtype=np.int32)
+		batch.done = np.zeros(n, dtype=bool)
+		batch.layouts = []
+		for i, board in enumerate(boards):
+			layout = []
+			for j, ship in enumerate(board.ships):
+				mask = 0
+				for coord, hit in zip(ship.coords, ship.hits):
+					batch.shipIds[i, coord.x, coord.y] = j
+					batch.hits[i, coord.x, coord.y] = hit
+					mask |= cellBit(coord.x, coord.y, batch.cols)
+				batch.shipLengths[i, j] = ship.length
+				batch.shipHits[i, j] = ship.hitsTaken
+				layout.append(mask)
+			if board.bitboard:
+				for r, c in iterCells(board.waterMask, batch.cols):
+					batch.water[i, r, c] = True
+			else:
+				for coord in board.waterhits:
+					batch.water[i, coord.x, coord.y] = True
+			batch.remaining[i] = board.getHealth()["remaining"]
+			batch.done[i] = board.isDefeated()
+			batch.layouts.append(tuple(layout))
+		return batch
+
+	def __len__(self):
+		return len(self.done)
+
+	def reset(self, indices = None):
+		"""
+		Clears the given boards and gives them new random ship layouts
+
+		:param indices: (Optional) Indices (or a boolean mask) of the boards to
+						reset.  Default is every board.
+		:return: Nothing
+		"""
+		if indices is None:
+			indices = np.arange(len(self))
+		indices = np.arange(len(self))[indices]
+
+		self.shipIds[indices] = -1
+		self.hits[indices] = False
+		self.water[indices] = False
+		self.shipHits[indices] = 0
+		self.done[indices] = False
+		cols = self.cols
+		for i in indices:
+			layout = next(self.layoutSource)
+			self.layouts[i] = layout
+			shipIds = self.shipIds[i]
+			for j, mask in enumerate(layout):
+				for r, c in iterCells(mask, cols):
+					shipIds[r, c] = j
+		self.remaining[indices] = self.shipLengths[indices].sum(axis=1)
+
+	def fire(self, actions):
+		"""
+		Fires one shot at every board.
+
+		Shots at finished boards (done) are ignored and get outcome NO_SHOT
+		and a reward of 0.
+
+		:param actions: (N,) array of the cell to fire at on each board
+						(row * cols + col), or (N, 2) array of (row, col)
+		:return: (rewards, done, outcomes), where:
+					rewards is an (N,) float array (see defaultRewards)
+					done is an (N,) bool array, True for boards whose whole
+					fleet is sunk (a copy of .done)
+					outcomes is an (N,) int8 array of ShotResult values (or
+					NO_SHOT)
+		"""
+		actions = np.asarray(actions)
+		n = len(self)
+		nCells = self.rows * self.cols
+		if actions.ndim == 2:
+			rows, cols = actions[:, 0], actions[:, 1]
+			onBoard = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+			cells = rows * self.cols + cols
+		else:
+			cells = actions
+			onBoard = (cells >= 0) & (cells < nCells)
+
+		boards = np.arange(n)
+		live = ~self.done
+		valid = onBoard & live
+		cells = np.where(valid, cells, 0)
+
+		shipIds = self.shipIds.reshape(n, nCells)
+		hits = self.hits.reshape(n, nCells)
+		water = self.water.reshape(n, nCells)
+
+		ship = shipIds[boards, cells]
+		fired = hits[boards, cells] | water[boards, cells]
+		new = valid & ~fired
+		isHit = new & (ship >= 0)
+		isMiss = new & (ship < 0)
+
+		water[boards[isMiss], cells[isMiss]] = True
+		hitBoards = boards[isHit]
+		hitShips = ship[isHit]
+		hits[hitBoards, cells[isHit]] = True
+		self.shipHits[hitBoards, hitShips] += 1
+		self.remaining[hitBoards] -= 1
+
+		sunk = np.zeros(n, dtype=bool)
+		sunk[hitBoards] = self.shipHits[hitBoards, hitShips] == self.shipLengths[hitBoards, hitShips]
+		defeated = isHit & (self.remaining == 0)
+		self.done |= defeated
+
+		outcomes = np.full(n, NO_SHOT, dtype=np.int8)
+		outcomes[live & ~onBoard] = ShotResult.OUTSIDE
+		outcomes[valid & fired] = ShotResult.DUPLICATE
+		outcomes[isMiss] = ShotResult.MISS
+		outcomes[isHit] = ShotResult.HIT
+		outcomes[sunk] = ShotResult.SUNK
+		outcomes[defeated] = ShotResult.DEFEATED
+
+		rewards = self.rewardTable[outcomes.astype(np.intp) + 1]
+		return (rewards, self.done.copy(), outcomes)
+
+	def observe(self):
+		"""
+		Returns what a player can see of each board: an (N, rows, cols) int8
+		array of 0 for cells not fired at, -1 for misses and 1 for hits
+
+		:return: NumPy array
+		"""
+		return self.hits.astype(np.int8) - self.water.astype(np.int8)
+
+	def toBoard(self, index):
+		"""
+		Makes a Board with the ships and shots of one board of the batch (eg
+		to display it).  The shots are fired in row-major order.
+
+		:param index: Index of the board in the batch
+		:return: Board
+		"""
+		board = Board(self.rows, self.cols, name="Batch board {}".format(index))
+		for ship in layoutToShips(self.layouts[index], self.cols, self.fleet):
+			board.addShip(ship)
+		fired = self.hits[index] | self.water[index]
+		for r, c in zip(*np.nonzero(fired)):
+			board.processFire((int(r), int(c)))
+		return board
+
+
+###########################
+# Test code for the methods
+###########################
+if __name__ == '__main__':
+	import time
+
+	n = 4096
+	batch = BoardBatch(n, 10, 10, ["Battleship", "Submarine", "Submarine"], seed=0)
+	rng = np.random.default_rng(0)
+
+	start = time.time()
+	steps = 0
+	while not batch.done.all():
+		# Fire at a random cell not fired at yet on each board
+		scores = rng.random((n, 100))
+		scores[batch.observe().reshape(n, 100) != 0] = -1
+		rewards, done, outcomes = batch.fire(scores.argmax(axis=1))
+		steps += 1
+	elapsed = time.time() - start
+	print("{} boards finished in {} steps, {:.3f}s ({:.0f} board-steps/sec)".format(n, steps, elapsed,
+	                                                                             n * steps / elapsed))
+	print(batch.toBoard(0).display(visible="all"))
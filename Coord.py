@@ -1,11 +1,33 @@
 class Coord(object):
 	"""
+	Immutable (row, col) coordinate.
 
+	Coords are interned: Coord((r, c)) usually returns the same object every
+	time it is called with the same (r, c), so they are cheap to make, compare
+	and use as dict keys/set members.  Because of that they must never be
+	changed after creation (attempting to set an attribute raises
+	AttributeError).  Equal Coords aren't guaranteed to be the same object
+	(see poolLimit), so compare them with ==, not is.
+
+	Coordinates can be accessed as .x/.y, .r/.c or the tuple .coord
 	"""
-	def __init__(self, coord = None):
+
+	# Only store the two values.  r, c and coord are views of x and y (see
+	# properties below)
+	__slots__ = ('x', 'y')
+
+	# Pool of the Coords made so far, keyed by (x, y)
+	_pool = {}
+
+	# Most Coords kept in the pool.  When it is full it is emptied and starts
+	# again, so long runs over large boards don't keep every coordinate ever
+	# touched.  Coords still in use elsewhere are unaffected.
+	poolLimit = 65536
+
+	def __new__(cls, coord = None):
 
 		# Get coordinate from user if not specified in call
-		if coord == None:
+		if coord is None:
 			while True:
 				# Prompt user for coord
 				coord = []
@@ -16,24 +38,95 @@ class Coord(object):
 					print("Invalid target - row/col must be integers")
 					continue
 
-		# Use coord but check for validity
+		# Coords are immutable, so one can be used as is
+		if type(coord) is cls:
+			return coord
+
+		# Reuse an existing Coord if we've seen this one before.  The type
+		# check stops (1.0, 2) from matching the pooled (1, 2)
 		try:
-			# Check for correct length
-			if not len(coord) == 2:
-				raise ValueError("Coordinate not correct length.  Must be pairs of integers")
-			elif not all([isinstance(c,int) for c in coord]):
-				raise ValueError("Coordinate values not correct.  Must be pairs of integers")
-
-			# A few ways to write the same thing... This is probably sloppy.
-			# Is there a way to make these all refer to the same base values,
-			# so if one changed all changed?
-			self.x = coord[0]
-			self.y = coord[1]
-			self.r = self.x
-			self.c = self.y
-			self.coord = (self.x, self.y)
-		except Exception as e:
-			raise e
+			self = cls._pool[coord]
+			if type(coord[0]) is int and type(coord[1]) is int:
+				return self
+		except (KeyError, TypeError):
+			# TypeError: coord was unhashable (eg a list) - fall through and
+			# let the validity checks sort it out
+			pass
+
+		# Use coord but check for validity
+		# Check for correct length
+		if not len(coord) == 2:
+			raise ValueError("Coordinate not correct length.  Must be pairs of integers")
+		elif not all([isinstance(c,int) for c in coord]):
+			raise ValueError("Coordinate values not correct.  Must be pairs of integers")
+
+		# coord may have been a list (unhashable) or other sequence, so look
+		# again using a tuple key before making a new Coord
+		key = (coord[0], coord[1])
+		self = cls._pool.get(key)
+		if self is None:
+			self = object.__new__(cls)
+			object.__setattr__(self, 'x', coord[0])
+			object.__setattr__(self, 'y', coord[1])
+			if len(cls._pool) >= cls.poolLimit:
+				cls._pool.clear()
+			cls._pool[key] = self
+		return self
+
+	@classmethod
+	def probe(cls, row, col):
+		"""
+		Returns a Coord equal to Coord((row, col)) without adding it to the
+		pool, for one-off lookups (eg checking set membership for every cell
+		drawn).  No checks are done on row and col.
+		"""
+		self = cls._pool.get((row, col))
+		if self is None:
+			self = object.__new__(cls)
+			object.__setattr__(self, 'x', row)
+			object.__setattr__(self, 'y', col)
+		return self
+
+	@classmethod
+	def clearPool(cls):
+		"""
+		Empties the pool of interned Coords.  Existing Coords keep working but
+		new ones made afterwards will be different objects (still equal).
+		"""
+		cls._pool.clear()
+
+	###########################
+	# Properties
+	###########################
+	@property
+	def r(self):
+		return self.x
+
+	@property
+	def c(self):
+		return self.y
+
+	@property
+	def coord(self):
+		return (self.x, self.y)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("Coord objects are immutable")
+
+	def __delattr__(self, name):
+		raise AttributeError("Coord objects are immutable")
+
+	# Coords are immutable, so copies can just be the same object.  This also
+	# keeps copy/deepcopy/pickle from calling __new__ without a coordinate
+	# (which would prompt the user)
+	def __copy__(self):
+		return self
+
+	def __deepcopy__(self, memo):
+		return self
+
+	def __reduce__(self):
+		return (Coord, ((self.x, self.y),))
 
 	def __repr__(self):
 		"""
@@ -42,18 +135,20 @@ class Coord(object):
 		"""
 		return "({}, {})".format(self.x,self.y)
 
+	def __hash__(self):
+		return hash((self.x, self.y))
+
 	def __eq__(self, other):
 		"""
 		Defines the conditions for equality between a Coord instance and another object
 		:param other: Some object
 		:return: True if equal
 		"""
-		try:
-			result = (self.__dict__ == other.__dict__) and (
-			type(self) == type(other))
-		except:
-			result = False
-		return result
+		if self is other:
+			return True
+		if type(other) is not type(self):
+			return False
+		return self.x == other.x and self.y == other.y
 
 	def __ne__(self, other):
 		"""
@@ -63,3 +158,23 @@ class Coord(object):
 		"""
 		return not self == other
 
+	# Ordering is row-major (by row, then by col)
+	def __lt__(self, other):
+		if not isinstance(other, Coord):
+			return NotImplemented
+		return (self.x, self.y) < (other.x, other.y)
+
+	def __le__(self, other):
+		if not isinstance(other, Coord):
+			return NotImplemented
+		return (self.x, self.y) <= (other.x, other.y)
+
+	def __gt__(self, other):
+		if not isinstance(other, Coord):
+			return NotImplemented
+		return (self.x, self.y) > (other.x, other.y)
+
+	def __ge__(self, other):
+		if not isinstance(other, Coord):
+			return NotImplemented
+		return (self.x, self.y) >= (other.x, other.y)
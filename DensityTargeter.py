@@ -0,0 +1,193 @@
+import random
+
+
+################################################################################
+# DensityTargeter class
+################################################################################
+class DensityTargeter(object):
+	"""
+	Shot selector (see Player.shotSelector) that fires at the cell most likely
+	to hold a ship.
+
+	For every ship length in the opponent's fleet it keeps each straight
+	placement that could still hold an unsunk ship, ie one that doesn't cross a
+	miss or a sunk ship.  Placements crossing hits that aren't part of a sunk
+	ship yet get extra weight (hitWeight per hit), which steers the targeter
+	to finish off ships it has found.  The density of a cell is the weighted
+	number of placements through it, times the number of unsunk ships of that
+	length, summed over lengths.  The unfired cell with the highest density is
+	fired at (ties broken randomly).
+
+	The targeter learns the results of its shots from board.shotHistory, and
+	only the placements crossing each new shot are updated.  It uses the
+	opponent's board only for its size, ship lengths, shot history and the
+	cells of a ship once that ship is sunk - the same information a player
+	gets in a real game.
+	"""
+
+	def __init__(self, seed = None, hitWeight = 20):
+		"""
+		:param seed: (Optional) Seed for breaking ties between equally good cells
+		:param hitWeight: Extra weight given to a placement for each
+						  unresolved hit it crosses
+		"""
+		self.rng = random.Random(seed)
+		self.hitWeight = hitWeight
+		self.board = None
+
+	def __call__(self, board):
+		"""
+		Chooses the next shot on board
+
+		:param board: Board being fired at
+		:return: (row, col) tuple
+		"""
+		self.sync(board)
+
+		score = self.score
+		fired = self.fired
+		best = -1
+		bestCells = []
+		for cell in range(len(score)):
+			if fired[cell]:
+				continue
+			value = score[cell]
+			if value > best:
+				best = value
+				bestCells = [cell]
+			elif value == best:
+				bestCells.append(cell)
+
+		if len(bestCells) == 0:
+			raise ValueError("Every cell on board {} has already been fired at".format(board.name))
+		cell = bestCells[self.rng.randrange(len(bestCells))]
+		return divmod(cell, self.cols)
+
+	def sync(self, board):
+		"""
+		Brings the density map up to date with board.shotHistory, only looking
+		at shots made since the last call.  Starts over if the board is a
+		different one or shots we already saw were undone (Board.undoShot).
+
+		:param board: Board being fired at
+		:return: Nothing
+		"""
+		history = board.shotHistory
+		if board is not self.board or len(history) < self.seen or \
+				(self.seen > 0 and history[self.seen - 1] is not self.lastSeen):
+			self.reset(board)
+
+		while self.seen < len(history):
+			self.lastSeen = history[self.seen]
+			coord, hitIndex = self.lastSeen
+			self.seen += 1
+			cell = coord.x * self.cols + coord.y
+			self.fired[cell] = 1
+			if hitIndex < 0:
+				self._block(cell)
+			else:
+				self.hitsSeen[hitIndex] = self.hitsSeen.get(hitIndex, 0) + 1
+				ship = board.ships[hitIndex]
+				if self.hitsSeen[hitIndex] == ship.length:
+					self._sink(ship)
+				else:
+					self._hit(cell)
+
+	def reset(self, board):
+		"""
+		Sets up an empty density map for board
+
+		:param board: Board being fired at
+		:return: Nothing
+		"""
+		self.board = board
+		self.seen = 0
+		self.lastSeen = None
+		self.rows = board.rows
+		self.cols = board.cols
+		nCells = self.rows * self.cols
+		self.fired = bytearray(nCells)
+		self.hitsSeen = {}
+
+		# Number of unsunk ships of each length
+		self.count = {}
+		for ship in board.ships:
+			self.count[ship.length] = self.count.get(ship.length, 0) + 1
+
+		# For each length:
+		#	placements - list of tuples of the cells in each placement
+		#	cellPlacements - for each cell, the placements crossing it
+		#	blocked - whether each placement crosses a miss or sunk ship
+		#	nHits - number of unresolved hits each placement crosses
+		#	density - weighted number of open placements through each cell
+		self.tables = {}
+		self.score = [0] * nCells
+		for length, count in self.count.items():
+			placements = []
+			for r in range(self.rows):
+				for c in range(self.cols - length + 1):
+					cell = r * self.cols + c
+					placements.append(tuple(range(cell, cell + length)))
+			if length > 1:
+				for r in range(self.rows - length + 1):
+					for c in range(self.cols):
+						cell = r * self.cols + c
+						placements.append(tuple(range(cell, cell + length * self.cols, self.cols)))
+
+			cellPlacements = [[] for i in range(nCells)]
+			density = [0] * nCells
+			for p, cells in enumerate(placements):
+				for cell in cells:
+					cellPlacements[cell].append(p)
+					density[cell] += 1
+			for cell in range(nCells):
+				self.score[cell] += count * density[cell]
+
+			self.tables[length] = (placements, cellPlacements, [False] * len(placements),
+			                       [0] * len(placements), density)
+
+	def _block(self, cell):
+		"""
+		Removes every placement crossing cell (a miss or part of a sunk ship)
+		"""
+		score = self.score
+		for length, (placements, cellPlacements, blocked, nHits, density) in self.tables.items():
+			count = self.count[length]
+			for p in cellPlacements[cell]:
+				if blocked[p]:
+					continue
+				blocked[p] = True
+				weight = 1 + self.hitWeight * nHits[p]
+				for c in placements[p]:
+					density[c] -= weight
+					score[c] -= count * weight
+
+	def _hit(self, cell):
+		"""
+		Adds hitWeight to every open placement crossing cell (a new hit)
+		"""
+		score = self.score
+		weight = self.hitWeight
+		for length, (placements, cellPlacements, blocked, nHits, density) in self.tables.items():
+			count = self.count[length]
+			for p in cellPlacements[cell]:
+				if blocked[p]:
+					continue
+				nHits[p] += 1
+				for c in placements[p]:
+					density[c] += weight
+					score[c] += count * weight
+
+	def _sink(self, ship):
+		"""
+		Blocks the cells of a newly sunk ship and removes one ship of its length
+		"""
+		for coord in ship.coords:
+			self._block(coord.x * self.cols + coord.y)
+
+		length = ship.length
+		self.count[length] -= 1
+		density = self.tables[length][4]
+		score = self.score
+		for c in range(len(score)):
+			score[c] -= density[c]
@@ -0,0 +1,102 @@
+from collections import namedtuple
+
+
+# Result of a Game.play().
+#	winner - index (0 or 1) of the winning player, or None if maxTurns ran out
+#	shots - tuple of the number of shots each player fired
+#	log - list of (playerIndex, (row, col), hitIndex) for every turn, where
+#		  hitIndex is what Board.processFire returned (-1 for a miss)
+GameResult = namedtuple("GameResult", ["winner", "shots", "log"])
+
+
+################################################################################
+# Game class
+################################################################################
+class Game(object):
+	"""
+	Headless game between two Players.  Neither printing nor user input is
+	involved - each player's shotSelector (see Player) chooses its shots.
+	Players take one shot per turn, player 0 first, until one of the boards
+	has no hits remaining.
+	"""
+
+	def __init__(self, player1, player2, maxTurns = None):
+		"""
+		:param player1: Player who fires first.  Must have a board and a shotSelector
+		:param player2: Player who fires second.  Must have a board and a shotSelector
+		:param maxTurns: (Optional) Stop with no winner after this many turns
+		"""
+		self.players = [player1, player2]
+		for player in self.players:
+			if player.board is None:
+				raise ValueError("Player {} has no board".format(player.name))
+			if player.shotSelector is None:
+				raise ValueError("Player {} has no shotSelector".format(player.name))
+
+		# Point the players at each other
+		player1.setOpponent(player2)
+		player2.setOpponent(player1)
+
+		self.maxTurns = maxTurns
+
+	def play(self):
+		"""
+		Plays the game to the end.
+
+		A shotSelector returning a shot that is off the board or already fired
+		at raises the board's usual exception (FireOutsideBoard/HitDuplicate).
+
+		:return: GameResult
+		"""
+		log = []
+		shots = [0, 0]
+		winner = None
+		current = 0
+		turn = 0
+
+		while self.maxTurns is None or turn < self.maxTurns:
+			attacker = self.players[current]
+			board = attacker.opponent.board
+
+			coord = attacker.chooseShot()
+			hitIndex = board.processFire(coord)
+			shotCoord = board.shotHistory[-1][0]
+			log.append((current, (shotCoord.x, shotCoord.y), hitIndex))
+			shots[current] += 1
+			turn += 1
+
+			# Only a hit can finish the game
+			if hitIndex >= 0 and board.isDefeated():
+				winner = current
+				break
+
+			current = 1 - current
+
+		return GameResult(winner, tuple(shots), log)
+
+
+###########################
+# Test code for the methods
+###########################
+if __name__ == '__main__':
+	from Board import Board
+	from Player import Player, randomShotSelector
+	from layoutGenerator import generateLayouts
+
+	fleet = ["Battleship", "Submarine", "Submarine"]
+	layouts = generateLayouts(10, 10, fleet, seed=0, count=2, asShips=True)
+
+	players = []
+	for i, ships in enumerate(layouts):
+		board = Board(10, 10, name="Board {}".format(i))
+		for ship in ships:
+			board.addShip(ship)
+		players.append(Player("Player {}".format(i), board=board, playerType="Random",
+		                      shotSelector=randomShotSelector(seed=i)))
+
+	result = Game(players[0], players[1]).play()
+	print("Winner: {}".format(result.winner))
+	print("Shots: {}".format(result.shots))
+	print("Turns: {}".format(len(result.log)))
+	print(players[0].board)
+	print(players[1].board)
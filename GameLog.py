@@ -0,0 +1,337 @@
+import bisect
+import functools
+import io
+import struct
+
+from Board import Board
+from ShotResult import ShotResult
+
+
+# File layout (all integers little-endian):
+#	header - magic b"BSLG", version, number of boards
+#	records - one after another, each starting with a tag byte:
+#		b"S" shot: board index, row, col, hitIndex, result (ShotResult)
+#		b"C" checkpoint: turn, number of boards, then each board as a 4 byte
+#			 length followed by Board.toBytes()
+# The first record is always the checkpoint for turn 0.
+_logMagic = b"BSLG"
+_logVersion = 1
+_headerStruct = struct.Struct("<4sBB")
+_shotStruct = struct.Struct("<BIIiB")
+_turnStruct = struct.Struct("<QB")
+_lengthStruct = struct.Struct("<I")
+_shotTag = b"S"
+_checkpointTag = b"C"
+
+
+################################################################################
+# GameLog class
+################################################################################
+class GameLog(object):
+	"""
+	Append-only log of every shot fired at a set of boards (eg the two boards
+	of a Game), with periodic checkpoints of the boards' state so any turn can
+	be restored without replaying the whole game.
+
+	The log subscribes to the boards' "miss" and "hit" events (see
+	Board.subscribe), so every shot is logged however it was fired, until
+	the log is closed.  Shots taken back with undoShot can't be removed from
+	the log, so don't undo shots on a board being logged.
+
+	Records are written to disk as they come in, through a buffer of at most
+	bufferSize bytes.  Only the file position of each checkpoint is kept in
+	memory.
+	"""
+
+	def __init__(self, boards, path = None, checkpointEvery = 100, bufferSize = 65536):
+		"""
+		:param boards: List of the Boards being logged, in their starting state
+		:param path: (Optional) File to write the log to (overwritten).  If not
+					 given the log is kept in memory.
+		:param checkpointEvery: Number of turns between checkpoints
+		:param bufferSize: Number of bytes buffered before writing to the file
+		"""
+		if checkpointEvery < 1:
+			raise ValueError("checkpointEvery must be at least 1")
+		self.path = path
+		self.checkpointEvery = checkpointEvery
+		self.bufferSize = bufferSize
+		self.boards = list(boards)
+		self.turn = 0
+
+		# Turn and file offset of each checkpoint, in turn order
+		self.checkpointTurns = []
+		self.checkpointOffsets = []
+
+		if path is None:
+			self.stream = io.BytesIO()
+		else:
+			self.stream = open(path, "wb")
+		self.buffer = bytearray(_headerStruct.pack(_logMagic, _logVersion, len(self.boards)))
+		self.offset = len(self.buffer)
+		self.checkpoint()
+
+		# (board, callback) for each board event we are subscribed to
+		self.subscriptions = []
+		for boardIndex, board in enumerate(self.boards):
+			callback = functools.partial(self._onShot, boardIndex)
+			for event in ("miss", "hit"):
+				board.subscribe(event, callback)
+				self.subscriptions.append((board, event, callback))
+
+	@classmethod
+	def load(cls, path):
+		"""
+		Opens a log written earlier for reading (replay/seek only - nothing can
+		be recorded to it).
+
+		Raises InvalidGameLog if path isn't a game log.
+
+		:param path: File written by a GameLog
+		:return: GameLog
+		"""
+		log = cls.__new__(cls)
+		log.path = path
+		log.stream = None
+		log.buffer = bytearray()
+		log.subscriptions = []
+		log.checkpointTurns = []
+		log.checkpointOffsets = []
+		log.turn = 0
+		with open(path, "rb") as f:
+			_readHeader(f)
+			for offset, record in _readRecords(f):
+				if record[0] == _checkpointTag:
+					log.checkpointTurns.append(record[1])
+					log.checkpointOffsets.append(offset)
+					log.turn = record[1]
+				else:
+					log.turn += 1
+			log.offset = f.tell()
+		log.boards = log.seek(log.turn)
+		log.checkpointEvery = None
+		log.bufferSize = 0
+		return log
+
+	def _onShot(self, boardIndex, board, event, coord, hitIndex):
+		"""
+		Board event callback: logs a shot that has just been fired at
+		boards[boardIndex]
+		"""
+		result = board.shotResult(hitIndex)
+		self._write(_shotTag + _shotStruct.pack(boardIndex, coord.x, coord.y, hitIndex, result))
+		self.turn += 1
+		if self.turn % self.checkpointEvery == 0:
+			self.checkpoint()
+
+	def checkpoint(self):
+		"""
+		Writes a checkpoint of the current state of the boards
+
+		:return: Nothing
+		"""
+		parts = [_checkpointTag, _turnStruct.pack(self.turn, len(self.boards))]
+		for board in self.boards:
+			data = board.toBytes()
+			parts.append(_lengthStruct.pack(len(data)))
+			parts.append(data)
+		self.checkpointTurns.append(self.turn)
+		self.checkpointOffsets.append(self.offset)
+		self._write(b"".join(parts))
+
+	def _write(self, data):
+		"""
+		Appends data to the log through the buffer
+		"""
+		self.buffer += data
+		self.offset += len(data)
+		if len(self.buffer) >= self.bufferSize:
+			self.flush()
+
+	def flush(self):
+		"""
+		Writes anything buffered to the file
+
+		:return: Nothing
+		"""
+		if self.stream is not None and self.buffer:
+			self.stream.write(self.buffer)
+			self.stream.flush()
+			self.buffer = bytearray()
+
+	def close(self):
+		"""
+		Stops logging shots and flushes and closes the file.  The log can
+		still be read afterwards.
+
+		:return: Nothing
+		"""
+		for board, event, callback in self.subscriptions:
+			board.unsubscribe(event, callback)
+		self.subscriptions = []
+		self.flush()
+		if self.stream is not None:
+			if self.path is None:
+				self.data = self.stream.getvalue()
+			self.stream.close()
+			self.stream = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def _open(self):
+		"""
+		Returns a new binary stream for reading the log so far
+		"""
+		self.flush()
+		if self.path is not None:
+			return open(self.path, "rb")
+		if self.stream is not None:
+			return io.BytesIO(self.stream.getvalue())
+		return io.BytesIO(self.data)
+
+	def events(self, start = 0):
+		"""
+		Generator of the logged shots, starting from turn start (turn n is the
+		(n+1)th shot).  Jumps to the checkpoint before start rather than
+		reading the log from the beginning.
+
+		:param start: First turn to return
+		:return: Generator of (turn, boardIndex, (row, col), hitIndex, result)
+		"""
+		index = bisect.bisect_right(self.checkpointTurns, start) - 1
+		turn = self.checkpointTurns[index]
+		with self._open() as f:
+			f.seek(self.checkpointOffsets[index])
+			for offset, record in _readRecords(f):
+				if record[0] == _shotTag:
+					if turn >= start:
+						yield (turn, record[1], (record[2], record[3]), record[4], ShotResult(record[5]))
+					turn += 1
+
+	def seek(self, turn):
+		"""
+		Returns new Boards in the state they were in after turn shots.
+
+		Starts from the nearest checkpoint at or before turn and only replays
+		the shots after it.  The boards come from Board.fromBytes, so each
+		board's shotHistory is not in the original order.
+
+		:param turn: Number of shots fired (0 for the starting boards)
+		:return: List of Boards
+		"""
+		if turn < 0 or turn > self.turn:
+			raise IndexError("Turn {} is not in the log (0 to {})".format(turn, self.turn))
+		index = bisect.bisect_right(self.checkpointTurns, turn) - 1
+		current = self.checkpointTurns[index]
+		with self._open() as f:
+			f.seek(self.checkpointOffsets[index])
+			records = _readRecords(f)
+			boards = [Board.fromBytes(data) for data in next(records)[1][2]]
+			for offset, record in records:
+				if current == turn:
+					break
+				if record[0] == _shotTag:
+					boards[record[1]].processFire((record[2], record[3]))
+					current += 1
+		return boards
+
+
+###########################
+# Helper Functions
+###########################
+def _readHeader(f):
+	"""
+	Reads the log header from f
+
+	:return: Number of boards in the log
+	"""
+	header = f.read(_headerStruct.size)
+	if len(header) != _headerStruct.size:
+		raise InvalidGameLog("Game log too short")
+	magic, version, nBoards = _headerStruct.unpack(header)
+	if magic != _logMagic:
+		raise InvalidGameLog("Not a game log (magic {})".format(magic))
+	if version != _logVersion:
+		raise InvalidGameLog("Game log version {} not supported (expected {})".format(version, _logVersion))
+	return nBoards
+
+def _readRecords(f):
+	"""
+	Generator of the records in f from its current position, as
+	(offset, record) where record is
+		(b"S", boardIndex, row, col, hitIndex, result) for a shot
+		(b"C", turn, [board bytes, ...]) for a checkpoint
+	Stops at the end of the file or at a record that was cut short (eg a
+	log that is still being written).
+	"""
+	while True:
+		offset = f.tell()
+		tag = f.read(1)
+		if tag == _shotTag:
+			data = f.read(_shotStruct.size)
+			if len(data) != _shotStruct.size:
+				return
+			yield (offset, (tag,) + _shotStruct.unpack(data))
+		elif tag == _checkpointTag:
+			data = f.read(_turnStruct.size)
+			if len(data) != _turnStruct.size:
+				return
+			turn, nBoards = _turnStruct.unpack(data)
+			boards = []
+			for i in range(nBoards):
+				data = f.read(_lengthStruct.size)
+				if len(data) != _lengthStruct.size:
+					return
+				length = _lengthStruct.unpack(data)[0]
+				data = f.read(length)
+				if len(data) != length:
+					return
+				boards.append(data)
+			yield (offset, (tag, turn, boards))
+		elif tag == b"":
+			return
+		else:
+			raise InvalidGameLog("Unknown record {} at offset {}".format(tag, offset))
+
+
+###########################
+# Exceptions
+###########################
+# Exception for files that aren't game logs this version can read
+class InvalidGameLog(Exception):
+	def __init__(self, value):
+		self.value = value
+
+	def __str__(self):
+		return repr(self.value)
+
+
+###########################
+# Test code for the methods
+###########################
+if __name__ == '__main__':
+	from Game import Game
+	from Player import Player, randomShotSelector
+	from layoutGenerator import generateLayouts
+
+	players = []
+	for i, ships in enumerate(generateLayouts(10, 10, ["Battleship", "Submarine", "Submarine"],
+	                                          seed=0, count=2, asShips=True)):
+		board = Board(10, 10, name="Board {}".format(i))
+		for ship in ships:
+			board.addShip(ship)
+		players.append(Player("Player {}".format(i), board=board, playerType="Random",
+		                      shotSelector=randomShotSelector(seed=i)))
+
+	with GameLog([player.board for player in players], checkpointEvery=20) as log:
+		result = Game(players[0], players[1]).play()
+	print("Logged {} turns with {} checkpoints".format(log.turn, len(log.checkpointTurns)))
+	for turn, boardIndex, coord, hitIndex, shotResult in log.events(start=log.turn - 5):
+		print("Turn {}: board {} fired at {} - {}".format(turn, boardIndex, coord, shotResult.name))
+	print("Boards halfway through:")
+	for board in log.seek(log.turn // 2):
+		print(board)
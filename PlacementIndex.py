@@ -0,0 +1,154 @@
+import random
+
+
+################################################################################
+# PlacementIndex class
+################################################################################
+class PlacementIndex(object):
+	"""
+	Keeps, for each ship length, the set of legal straight placements (slots)
+	left on a board so a random placement can be picked without searching the
+	board.
+
+	A slot is an origin plus a direction ("R" for right or "D" for down - left
+	and up would just be the same placements again).  Internally slots are
+	packed into integers as (row*cols + col)*2 + (0 for "R", 1 for "D").
+
+	The slots for a length are found the first time that length is asked for
+	(one pass over the board).  After that, invalidate() must be called with
+	the cells of every ship added to the board, which removes only the slots
+	crossing those cells.
+	"""
+
+	def __init__(self, rows, cols, shipMap):
+		"""
+		:param rows: Number of rows on the board
+		:param cols: Number of columns on the board
+		:param shipMap: The board's shipMap (2D list, -1 for empty).  Only read
+						when building the slots for a new length.
+		"""
+		self.rows = rows
+		self.cols = cols
+		self.shipMap = shipMap
+
+		# slots[length] is a list of packed slots and slotPos[length] maps each
+		# packed slot to its position in that list.  The pair works as a set
+		# that supports both O(1) removal (swap with the last element and pop)
+		# and O(1) uniform random choice.
+		self.slots = {}
+		self.slotPos = {}
+
+	def count(self, length):
+		"""
+		Returns the number of legal placements for a ship of this length
+
+		:param length: Ship length
+		:return: Integer number of slots
+		"""
+		return len(self._getSlots(length))
+
+	def choose(self, length, rng=None):
+		"""
+		Returns a uniformly random legal placement for a ship of this length
+
+		:param length: Ship length
+		:param rng: (Optional) random.Random instance to draw from.  Uses the
+					random module if not given
+		:return: Tuple of (row, col, direction), or None if there is no room
+		"""
+		slots = self._getSlots(length)
+		if len(slots) == 0:
+			return None
+		if rng is None:
+			rng = random
+		return self.unpack(slots[rng.randrange(len(slots))])
+
+	def unpack(self, slot):
+		"""
+		Converts a packed slot into (row, col, direction)
+
+		:param slot: Packed integer slot
+		:return: Tuple of (row, col, direction)
+		"""
+		cell, down = divmod(slot, 2)
+		row, col = divmod(cell, self.cols)
+		if down:
+			return (row, col, "D")
+		else:
+			return (row, col, "R")
+
+	def invalidate(self, coords):
+		"""
+		Removes every slot that crosses any of coords (for each length already
+		built).  Call this whenever a ship is added to the board.
+
+		:param coords: List of Coord objects now occupied
+		:return: Nothing
+		"""
+		for length, slots in self.slots.items():
+			slotPos = self.slotPos[length]
+			for coord in coords:
+				row, col = coord.x, coord.y
+				# A right-pointing slot crosses (row, col) if its origin is up
+				# to length-1 columns to the left.  Down-pointing slots are the
+				# same but with rows above.
+				for k in range(length):
+					if col - k >= 0:
+						self._remove(slots, slotPos, ((row * self.cols + col - k) << 1))
+					if row - k >= 0:
+						self._remove(slots, slotPos, (((row - k) * self.cols + col) << 1) | 1)
+
+	def _remove(self, slots, slotPos, slot):
+		"""
+		Removes slot from slots/slotPos if present, by moving the last slot into
+		its place
+
+		:return: Nothing
+		"""
+		i = slotPos.pop(slot, None)
+		if i is None:
+			return
+		last = slots.pop()
+		if last != slot:
+			slots[i] = last
+			slotPos[last] = i
+
+	def _getSlots(self, length):
+		"""
+		Returns the slot list for this length, building it if necessary
+
+		:param length: Ship length
+		:return: List of packed slots (owned by the index - do not modify)
+		"""
+		try:
+			return self.slots[length]
+		except KeyError:
+			pass
+
+		# Build from the free run lengths.  Scanning from the bottom right,
+		# runRight is how many free cells there are from (row, col) going right
+		# (including (row, col)).  runDown[col] is the same going down, carried
+		# over from the row below.  A slot fits if
+		# the run from its origin is at least length long.
+		rows, cols, shipMap = self.rows, self.cols, self.shipMap
+		slots = []
+		runDown = [0] * cols
+		for row in range(rows - 1, -1, -1):
+			mapRow = shipMap[row]
+			runRight = 0
+			for col in range(cols - 1, -1, -1):
+				if mapRow[col] >= 0:
+					runRight = 0
+					runDown[col] = 0
+					continue
+				runRight += 1
+				runDown[col] += 1
+				cell = row * cols + col
+				if runRight >= length:
+					slots.append(cell << 1)
+				if runDown[col] >= length:
+					slots.append((cell << 1) | 1)
+
+		self.slots[length] = slots
+		self.slotPos[length] = {slot: i for i, slot in enumerate(slots)}
+		return slots
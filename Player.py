@@ -1,26 +1,60 @@
+import random
+
+from DensityTargeter import DensityTargeter
+from ShotResult import ShotResult
+
+
 class Player(object):
 
-	def __init__(self, name, board = None, opponent = None, playerType = "Human"):
+	def __init__(self, name, board = None, opponent = None, playerType = "Human", shotSelector = None):
 
 		self.name = name
 		self.board = board
 		self.opponent = opponent
 		self.playerType = playerType
 
+		# shotSelector is an optional callable used to choose shots without
+		# asking anyone (eg, for a headless Game).  It is called as
+		# shotSelector(board) with the opponent's board and must return the
+		# coordinate to fire at as a tuple or Coord.  AI players get a
+		# DensityTargeter unless told otherwise.
+		if shotSelector is None and playerType == "AI":
+			shotSelector = DensityTargeter()
+		self.shotSelector = shotSelector
+
 	def setBoard(self, board):
 		self.board = board
 
 	def setOpponent(self, opponent):
 		self.opponent = opponent
 
+	def setShotSelector(self, shotSelector):
+		self.shotSelector = shotSelector
+
+	def chooseShot(self):
+		"""
+		Asks this player's shotSelector where to fire on the opponent's board
+
+		:return: Coordinate (tuple or Coord) to fire at
+		"""
+		return self.shotSelector(self.opponent.board)
+
 	def fire(self):
 		print()
-		print("Player {} attacking:")
+		print("Player {} attacking:".format(self.name))
 		if self.playerType == 'Human':
 			self.opponent.board.interactiveFire()
-		elif playerType == 'AI':
-			print("Computers don't know how to shoot...yet")
-		print("Player {} attack complete:")
+		elif self.playerType == 'AI':
+			outcome = self.opponent.board.fire(self.chooseShot())
+			if outcome.result == ShotResult.MISS:
+				print("{} fires at {} - Miss!".format(self.name, outcome.coord))
+			elif outcome.result == ShotResult.HIT:
+				print("{} fires at {} - HIT!".format(self.name, outcome.coord))
+			elif outcome.result in (ShotResult.SUNK, ShotResult.DEFEATED):
+				print("{} fires at {} - sunk {}!".format(self.name, outcome.coord, outcome.ship.name))
+			else:
+				raise ValueError("Shot selector chose invalid shot {} ({})".format(outcome.coord, outcome.result.name))
+		print("Player {} attack complete:".format(self.name))
 
 
 	def __repr__(self):
@@ -35,3 +69,40 @@ class Player(object):
 		except AttributeError:
 			display = display + "Opponent: {}\n".format("None")
 		return display
+
+
+###########################
+# Shot selectors
+###########################
+def randomShotSelector(seed = None):
+	"""
+	Returns a shotSelector (see Player) that fires at a uniformly random cell
+	that hasn't been fired at yet.
+
+	The selector shuffles all of a board's cells the first time it sees that
+	board and then works through them in order, skipping any that have
+	already been fired at (eg by someone else), so each shot is O(1).
+
+	:param seed: (Optional) Seed for the selector's own random number generator
+	:return: Callable taking a Board and returning a (row, col) tuple
+	"""
+	rng = random.Random(seed)
+
+	# Remaining shuffled cells for the board being fired at.  Stored as a list
+	# so the closure below can replace the contents for a new board.
+	state = [None, []]
+
+	def selector(board):
+		if state[0] is not board:
+			cells = [(r, c) for r in range(board.rows) for c in range(board.cols)]
+			rng.shuffle(cells)
+			state[0] = board
+			state[1] = cells
+		cells = state[1]
+		while cells:
+			cell = cells.pop()
+			if not board.isFired(cell):
+				return cell
+		raise ValueError("Every cell on board {} has already been fired at".format(board.name))
+
+	return selector
@@ -1,6 +1,9 @@
 from Coord import Coord
-import copy
-from printArgs import printArgs
+from chooseFromList import chooseFromList
+import tracing
+
+# Trace points for this module (see tracing)
+_trace = tracing.getTracer("Ship")
 
 
 ################################################################################
@@ -15,11 +18,31 @@ class Ship(object):
 		self.boardID = boardID
 		self.length = length
 
-		# Initialize coordinates and hits
+		# Initialize coordinates and hits.  hitsTaken counts the True entries
+		# in hits so health checks don't need to count them every time - so
+		# change hits through takeFire/markHit/clearHit rather than directly.
 		self.coords = [None for x in range(1,length+1)]
 		self.hits = [False,] * self.length
+		self.hitsTaken = 0
+
+		# Position of each coordinate in coords, so finding where (or whether)
+		# a shot lands on the ship is one lookup.  Set with setCoords.
+		self.coordIndex = {}
+
+		# Callbacks for ship events (see subscribe), keyed by event name, or
+		# None if nothing has subscribed
+		self._subscribers = None
+
+	def __getstate__(self):
+		"""
+		State for copy/deepcopy/pickle.  Copies start with no subscribers (see
+		subscribe).
+		"""
+		state = self.__dict__.copy()
+		state["_subscribers"] = None
+		return state
 
-	def __repr__(self, debug = False):
+	def __repr__(self):
 		"""
 		# Format the printing of Ships
 		# This defines what is returned when I do "print(myShip)", that way I don't need to keep writing something
@@ -53,15 +76,14 @@ class Ship(object):
 		return "{shipClass:<12} ({ID}): {name}\nLength          : {length}\nLocation        : {location}\n{hitHeader:<16}: {hits}".format(shipClass=self.shipClass, ID=self.boardID, name=self.name, length=self.length, location=coordsStr, hitHeader="Hits:", hits=hitsStr)
 
 
-	def setCoords(self, coords = None, debug = False):
+	def setCoords(self, coords = None):
 		"""
 		Method for setting the coordinates of a ship.
 		:param coords: list of tuples or Coord objects.  Tuples will be converted internally to Coord objects.
 		:return: Return 1 if completed (not sure why I did this...)
 		"""
 
-		if debug == True:
-			printArgs(exclude = ['self'])
+		if _trace.enabled: _trace("setCoords", "Ship {} setCoords({})", self.name, coords if coords is None else tuple(coords))
 
 		if coords == None:
 			# Get coords interactively from user
@@ -70,17 +92,16 @@ class Ship(object):
 				print("Set the coordinate of ship {}'s pip {}".format(self.name, i))
 				coords[i] = Coord()
 
-			if debug == True:
-				print("setCoords coords interactively defined as:")
-				print(coords)
+			if _trace.enabled: _trace("setCoords.interactive", "setCoords coords interactively defined as {}", tuple(coords))
 
 		if len(coords) == self.length:
-			self.coords = [coord if isinstance(coord,Coord) else Coord(coord) for coord in coords]
+			self.coords = [Coord(coord) for coord in coords]
+			self.coordIndex = {coord: i for i, coord in enumerate(self.coords)}
 		else:
 			raise IncorrectShipLength("Ship \"{}\" expects coords of length {}, received length {}".format(self.name, self.length, len(coords)))
 		return 1
 
-	def getStraightCoords(self, origin = None, direction = None, debug = False):
+	def getStraightCoords(self, origin = None, direction = None):
 		"""
 		Method to generate the coordinates of a ship based on an origin coordinate and direction (U/D/L/R).  Prompts user for origin/direction if left as None.
 
@@ -90,20 +111,18 @@ class Ship(object):
 		:return:  List of tuples for the coordinates of the ship
 		"""
 
-		if debug == True:
-			printArgs(exclude=['self'])
+		if _trace.enabled: _trace("getStraightCoords", "Ship {} getStraightCoords(origin={}, direction={})", self.name, origin, direction)
 
 		# Initialize the output list of coordinates
 		coords = [None] * self.length
 
-		# Get origin, convert tuple origin to Coord, or make a deepcopy of origin as coords[0]
+		# Get origin or convert tuple origin to Coord as coords[0].  Coords are
+		# immutable, so an existing Coord can be used as is.
 		if origin == None:
 			print("Set the origin of the ship:")
 			coords[0] = Coord()
-		elif not isinstance(origin,Coord):
-			coords[0]= Coord(origin)
 		else:
-			coords[0] = copy.deepcopy(origin)
+			coords[0] = Coord(origin)
 
 		# Function for determining if a direction string is valid
 		def validDirection(direction):
@@ -145,49 +164,71 @@ class Ship(object):
 
 
 
-	def takeFire(self, fireCoord, debug=False):
+	def takeFire(self, fireCoord):
 		"""
 		Accepts a coordinate being fired on and returns either -1 (miss) or the integer number of the segment that was hit.
 
 		If hit, method updates the ship's record of hits.  If hit somewhere that is already hit, method raises a
 		HitDuplicate exception.
 
+		Ships on a Board must be fired at through the Board (fire/processFire), not here: the board keeps its own
+		totals of hits (getHealth, isDefeated) and its rendering, which only change through Board methods.
+
 		:param fireCoord: Tuple coordinate of fire to test for a hit
 		:return: -1 (miss) or integer segment of the ship that was hit (ie: fireCoord == ship.coord[2], return 2)
 		"""
 		# Convert fireCoord to a Coord object if necessary
-		if not isinstance(fireCoord,Coord):
-			fireCoord = Coord(fireCoord)
-		else:
-			fireCoord = copy.deepcopy(fireCoord)
+		fireCoord = Coord(fireCoord)
 
-		if debug==True:
-			print("Ship {} taking fire at coord {}".format(self.name,fireCoord))
-		try:
-			coordStatus = self.coordStatus(fireCoord)
-			if coordStatus['hit'] == True:
-				raise HitDuplicate("Ship {} already hit at coordinate {}".format(self.name, fireCoord))
-			else:
-				# Assign the hit to the ship
-				self.hits[coordStatus["i"]] = True
-
-				# Print to screen for debugging
-				if debug==True:
-					print("Ship {} hit at coordinate {}".format(self.name, fireCoord))
-
-				# Return the index of the hit
-				return(coordStatus["i"])
-		# # TODO: Do I need both of these exceptions?
-		# except ValueError:
-		# 	# Return -1 for a miss
-		# 	if debug==True:
-		# 		print("Ship {} missed at coordinate {}".format(self.name, fireCoord))
-		# 	return(-1)
-		except InvalidCoord:
-			# Indicates the coord was either not valid or not on the ship at all
-			if debug == True:
-				print("Ship {} missed at coordinate {}".format(self.name, fireCoord))
+		if _trace.enabled: _trace("takeFire", "Ship {} taking fire at coord {}", self.name, fireCoord)
+
+		# A miss is the common case, so look the coord up rather than going
+		# through coordStatus (which raises InvalidCoord for a miss)
+		i = self.coordIndex.get(fireCoord)
+		if i is None:
+			if _trace.enabled: _trace("takeFire.miss", "Ship {} missed at coordinate {}", self.name, fireCoord)
 			return (-1)
+		if self.hits[i]:
+			raise HitDuplicate("Ship {} already hit at coordinate {}".format(self.name, fireCoord))
+
+		# Assign the hit to the ship
+		self.markHit(i)
+
+		if _trace.enabled: _trace("takeFire.hit", "Ship {} hit at coordinate {}", self.name, fireCoord)
+
+		# Return the index of the hit
+		return(i)
+
+	def markHit(self, i, notify = True):
+		"""
+		Records a hit on segment i of the ship (no checks - see takeFire)
+
+		:param i: Index of the segment hit
+		:param notify: If False, don't send the ship's events.  The caller
+					   must send them with _emitHit once it has finished
+					   updating (eg Board, so callbacks see the whole shot).
+		:return: Nothing
+		"""
+		if not self.hits[i]:
+			self.hits[i] = True
+			self.hitsTaken += 1
+			if notify and self._subscribers:
+				self._emitHit(i)
+
+	def clearHit(self, i, notify = True):
+		"""
+		Removes the hit on segment i of the ship, if any (eg to undo a shot)
+
+		:param i: Index of the segment
+		:param notify: If False, don't send the ship's "undo" event (see
+					   markHit)
+		:return: Nothing
+		"""
+		if self.hits[i]:
+			self.hits[i] = False
+			self.hitsTaken -= 1
+			if notify and self._subscribers:
+				self._emit("undo", i)
 
 	# Return the health of a ship.  Returned results are:
 	#  [hits remaining, hits taken]
@@ -198,11 +239,68 @@ class Ship(object):
 		:return: A tuple of (hitsRemaining, hitsTaken) for this ship
 		:return: A dictionary with hits "taken" and hits "remaining"
 		"""
-		hitsTaken = self.hits.count(True)
-		hitsRemaining = self.hits.count(False)
-		return {"taken": hitsTaken, "remaining": hitsRemaining}
+		return {"taken": self.hitsTaken, "remaining": self.length - self.hitsTaken}
+
+	def isSunk(self):
+		"""
+		Returns True if every segment of the ship has been hit.  O(1).
+		"""
+		return self.hitsTaken == self.length
+
+	def subscribe(self, event, callback):
+		"""
+		Calls callback(ship, event, segment) every time event happens to this
+		ship, after the ship (and, for shots fired through a Board, the board)
+		has been updated.  Ship events come before the board's events for the
+		same shot.  Events are:
+			"hit" - segment was hit
+			"sunk" - the hit on segment sunk the ship (after its "hit")
+			"undo" - the hit on segment was taken back
+		A Board.clone made after subscribing doesn't send events to callback.
+
+		:param event: One of the event names above
+		:param callback: Callable taking (ship, event, segment)
+		:return: Nothing
+		"""
+		if event not in shipEvents:
+			raise ValueError("Unknown ship event \"{}\" (expected one of {})".format(event, ", ".join(shipEvents)))
+		if self._subscribers is None:
+			self._subscribers = {}
+		self._subscribers[event] = self._subscribers.get(event, ()) + (callback,)
+
+	def unsubscribe(self, event, callback):
+		"""
+		Stops calling callback for event (see subscribe)
+
+		:param event: Event name callback was subscribed to
+		:param callback: Callable given to subscribe
+		:return: Nothing
+		"""
+		callbacks = list((self._subscribers or {}).get(event, ()))
+		if callback not in callbacks:
+			raise ValueError("Callback is not subscribed to ship event \"{}\"".format(event))
+		callbacks.remove(callback)
+		if callbacks:
+			self._subscribers[event] = tuple(callbacks)
+		else:
+			del self._subscribers[event]
 
-	def coordStatus(self, coord, debug=False):
+	def _emit(self, event, segment):
+		"""
+		Calls every subscriber to event
+		"""
+		for callback in self._subscribers.get(event, ()):
+			callback(self, event, segment)
+
+	def _emitHit(self, segment):
+		"""
+		Sends the events for a new hit on segment
+		"""
+		self._emit("hit", segment)
+		if self.hitsTaken == self.length:
+			self._emit("sunk", segment)
+
+	def coordStatus(self, coord):
 		"""
 		Accepts a coordinate and returns the status of that coordinate on the ship
 
@@ -216,21 +314,13 @@ class Ship(object):
 		"""
 
 		# Convert coord to Coord object if necessary
-		if not isinstance(coord, Coord):
-			coord = Coord(coord)
-		else:
-			coord = copy.deepcopy(coord)
+		coord = Coord(coord)
 
-		if debug == True:
-			print("Checking ship {}'s status at coordinate {}".format(self.name, coord))
-			printArgs()
-			print(type(coord))
+		if _trace.enabled: _trace("coordStatus", "Checking ship {}'s status at coordinate {}", self.name, coord)
 
 		# Find the coord in the ship
-		try:
-			# Does this work with Coord object?
-			i = self.coords.index(coord)
-		except ValueError:
+		i = self.coordIndex.get(coord)
+		if i is None:
 			raise InvalidCoord("Coordinate {} is not on ship {}".format(coord,self.name))
 
 		hit = self.hits[i]
@@ -238,6 +328,10 @@ class Ship(object):
 		return {"i": i, "hit": hit}
 
 
+# Events that can be subscribed to with Ship.subscribe
+shipEvents = ("hit", "sunk", "undo")
+
+
 	###########################
 # Ship Subclasses
 ###########################
@@ -319,7 +413,7 @@ def getShipClasses():
 ###########################
 # Module Methods
 ###########################
-def shipType2Ship(shipTypes=None, debug=True):
+def shipType2Ship(shipTypes=None):
 	"""
 	Returns a list of Ship instances given either a list of Ship subclass
 	references, a list of Ship subclass names, or Ship subclasses chosen by
@@ -327,11 +421,9 @@ def shipType2Ship(shipTypes=None, debug=True):
 
 	:param shipTypes: (optional) List of ship subclasses or strings of the
 					  names of ship subclasses (can be mixture of both)
-	:param debug: Boolean for debug printing
 	:return: List of isntances of Ship subclasses requested
 	"""
-	if debug == True:
-		printArgs(exclude=['self'])
+	if _trace.enabled: _trace("shipType2Ship", "shipType2Ship(shipTypes={})", shipTypes if shipTypes is None else tuple(shipTypes))
 
 	# If shipTypes is not specified, use shipTypes prompt user for the types to be placed
 	# getShipClasses returns the ship subclass objects available.  Form
@@ -359,9 +451,7 @@ def shipType2Ship(shipTypes=None, debug=True):
 			else:
 				shipTypes.append(shipSubclasses[newShip])
 
-		if debug == True:
-			print("shipTypes interactively chosen to be:")
-			print(shipTypes)
+		if _trace.enabled: _trace("shipType2Ship.interactive", "shipTypes interactively chosen to be {}", tuple(shipTypes))
 	else:
 		# Ensure all shipTypes elements are Ship subclasses.
 		# Convert any that aren't Ship subclasses by name using dict.
@@ -376,27 +466,14 @@ def shipType2Ship(shipTypes=None, debug=True):
 			try:
 				if issubclass(shipType, Ship):
 					validatedShipTypes[i] = shipType
-					if debug == True:
-						print(
-							"Found shipType that is subclass of Ship.  Storing into shipTypes")
 			except TypeError:
 				validatedShipTypes[i] = shipSubclasses[shipType]
-				if debug == True:
-					print(
-						"Found shipType that is name of Ship subclass in shipSubclasses.  Storing into shipTypes")
 		shipTypes = validatedShipTypes
 
-	if debug == True:
-		print("shipTypes:")
-		print(shipTypes)
-
 	# Make a list of instances of ships as specified by shipTypes
 	ships = [ship(ship.__name__) for ship in shipTypes]
 
-	if debug == True:
-		print("automatically generated ships from shipTypes")
-		for ship in ships:
-			print(ship)
+	if _trace.enabled: _trace("shipType2Ship.ships", "Generated ships {}", tuple(ship.name for ship in ships))
 
 	return ships
 
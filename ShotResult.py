@@ -0,0 +1,31 @@
+import enum
+from collections import namedtuple
+
+
+################################################################################
+# ShotResult class
+################################################################################
+class ShotResult(enum.IntEnum):
+	"""
+	What happened to a shot fired with Board.fire
+	"""
+	MISS = 0		# Hit water
+	HIT = 1			# Hit a ship that is still afloat
+	SUNK = 2		# Hit and sunk a ship, but the board has ships left
+	DEFEATED = 3	# Hit and sunk the last ship on the board
+	DUPLICATE = 4	# Already fired at - nothing changed
+	OUTSIDE = 5		# Not on the board - nothing changed
+
+# Result of Board.fire.
+#	result - ShotResult
+#	shipIndex - index of the ship hit (or already hit, for a DUPLICATE), or
+#				-1 if the shot is in water/off the board
+#	ship - the Ship at shipIndex, or None
+#	coord - the Coord fired at
+FireOutcome = namedtuple("FireOutcome", ["result", "shipIndex", "ship", "coord"])
+
+# Result of Board.fireMany.
+#	outcomes - FireOutcome for each coordinate fired at, in order
+#	sunk - indices of the ships sunk by the salvo, in the order they sank
+#	defeated - True if the salvo sunk the last ship on the board
+SalvoResult = namedtuple("SalvoResult", ["outcomes", "sunk", "defeated"])
@@ -0,0 +1,142 @@
+import hashlib
+import multiprocessing
+
+from Board import Board
+from Game import Game
+from Player import Player, randomShotSelector
+from layoutGenerator import generateLayouts
+
+
+def deriveSeed(seed, *keys):
+	"""
+	Returns a 64 bit integer seed derived from seed and any number of keys.
+
+	Used to give every game (and each thing within a game that needs random
+	numbers) its own independent, reproducible stream: the seed for game i
+	only depends on (seed, i), not on which worker plays it or in what order.
+
+	:param seed: Base seed for the whole batch (anything with a str())
+	:param keys: Further values to mix in (eg game index, player index)
+	:return: Integer seed
+	"""
+	text = ":".join(str(x) for x in (seed,) + keys)
+	return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+
+
+def playSeededGame(rows, cols, fleet, selectors, seed, gameIndex, keepLog = True):
+	"""
+	Builds two boards and plays one headless Game, with every random choice
+	(ship layouts and each player's shot selector) seeded from
+	(seed, gameIndex).
+
+	:param rows: Number of rows on each board
+	:param cols: Number of columns on each board
+	:param fleet: Fleet for each board (see layoutGenerator.generateLayouts)
+	:param selectors: Pair of shot selector factories, one per player.  Each
+					  is called with a seed and must return a shotSelector
+					  (eg randomShotSelector)
+	:param seed: Base seed for the batch
+	:param gameIndex: Index of this game in the batch
+	:param keepLog: If False, the returned result has log = None
+	:return: GameResult
+	"""
+	layouts = generateLayouts(rows, cols, fleet, seed=deriveSeed(seed, gameIndex, "layout"),
+	                          count=2, asShips=True)
+	players = []
+	for i, ships in enumerate(layouts):
+		board = Board(rows, cols, name="Game {} board {}".format(gameIndex, i))
+		for ship in ships:
+			board.addShip(ship)
+		selector = selectors[i](deriveSeed(seed, gameIndex, "player", i))
+		players.append(Player("Player {}".format(i), board=board, playerType="Batch",
+		                      shotSelector=selector))
+
+	result = Game(players[0], players[1]).play()
+	if not keepLog:
+		result = result._replace(log=None)
+	return result
+
+
+def _playChunk(args):
+	"""
+	Worker function: plays games [start, stop) and returns their results as a
+	list.  Takes a single tuple so it can be used with Pool.imap.
+	"""
+	start, stop, rows, cols, fleet, selectors, seed, keepLog = args
+	return [playSeededGame(rows, cols, fleet, selectors, seed, i, keepLog) for i in range(start, stop)]
+
+
+def runBatch(nGames, rows = 10, cols = 10, fleet = ("Battleship", "Submarine", "Submarine"),
+             selectors = (randomShotSelector, randomShotSelector), seed = 0, processes = None,
+             chunkSize = 100, ordered = True, keepLog = False):
+	"""
+	Plays nGames headless games across a pool of worker processes and yields
+	the results as they come back.
+
+	Workers are only sent the game settings and a range of game indices; each
+	builds its own boards and players, so no Board objects are pickled.  The
+	games are the same whatever processes/chunkSize are (see deriveSeed).
+
+	Selector factories are sent to the workers, so they must be picklable
+	(module level functions or classes).
+
+	:param nGames: Number of games to play
+	:param rows: Number of rows on each board
+	:param cols: Number of columns on each board
+	:param fleet: Fleet for each board (see layoutGenerator.generateLayouts)
+	:param selectors: Pair of shot selector factories (see playSeededGame)
+	:param seed: Base seed for the batch
+	:param processes: Number of worker processes.  None uses every CPU, 1
+					  plays the games in this process without a pool.
+	:param chunkSize: Number of games per work unit sent to a worker
+	:param ordered: If True results are yielded in game order.  If False they
+					are yielded as soon as each chunk finishes.
+	:param keepLog: If False (default), drop each game's turn log to keep the
+					results small
+	:return: Generator of (gameIndex, GameResult)
+	"""
+	chunks = [(start, min(start + chunkSize, nGames), rows, cols, fleet, selectors, seed, keepLog)
+	          for start in range(0, nGames, chunkSize)]
+
+	if processes == 1:
+		for chunk in chunks:
+			for i, result in enumerate(_playChunk(chunk)):
+				yield (chunk[0] + i, result)
+		return
+
+	# Tag each chunk's results with its start so unordered results can still
+	# be matched to their games
+	with multiprocessing.Pool(processes) as pool:
+		if ordered:
+			chunkResults = pool.imap(_playTaggedChunk, chunks)
+		else:
+			chunkResults = pool.imap_unordered(_playTaggedChunk, chunks)
+		for start, results in chunkResults:
+			for i, result in enumerate(results):
+				yield (start + i, result)
+
+
+def _playTaggedChunk(args):
+	"""
+	As _playChunk, but returns (start, results)
+	"""
+	return (args[0], _playChunk(args))
+
+
+###########################
+# Test code for the methods
+###########################
+if __name__ == '__main__':
+	import time
+
+	n = 2000
+	for processes in [1, None]:
+		start = time.time()
+		wins = [0, 0]
+		totalShots = 0
+		for gameIndex, result in runBatch(n, seed=1, processes=processes):
+			wins[result.winner] += 1
+			totalShots += sum(result.shots)
+		elapsed = time.time() - start
+		print("processes={}: {} games in {:.2f}s ({:.0f} games/sec)".format(processes, n, elapsed, n / elapsed))
+		print("\twins: {}, average shots per game: {:.1f}".format(wins, totalShots / n))
@@ -0,0 +1,371 @@
+"""
+Benchmarks for the Board, Ship and rendering hot paths.
+
+Times the core operations across board sizes and fleet sizes, prints a
+table and optionally writes the results as JSON and compares them against
+a saved baseline:
+
+	python benchmark.py --output baseline.json
+	... change things ...
+	python benchmark.py --baseline baseline.json
+
+Every benchmark is seeded, so each run does the same work.  Times are the
+best of --repeat runs, in seconds per operation.  Comparing against a
+baseline exits with status 1 if anything got more than --threshold slower.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+
+from Board import Board, InvalidShipPlacement, HitDuplicate
+from Coord import Coord
+from Game import Game
+from Player import Player, randomShotSelector
+from Ship import Battleship, Submarine
+
+
+# Modes display is benchmarked in
+displayModes = [(visible, sDisp) for visible in ("all", "revealed") for sDisp in ("ID", "type")]
+
+
+###########################
+# Timing
+###########################
+def measure(setup, run, repeat = 3, minTime = 0.05):
+	"""
+	Returns the best time per operation of run, over repeat runs.
+
+	Each run calls setup() (not timed) and then run(state) (timed) with what
+	setup returned, as many times as needed to take at least minTime
+	seconds.  run must return the number of operations it did.
+
+	:param setup: Callable returning the state for run
+	:param run: Callable taking the state and returning a number of operations
+	:param repeat: Number of runs to take the best of
+	:param minTime: Minimum timed seconds per run
+	:return: Seconds per operation
+	"""
+	best = None
+	for i in range(repeat):
+		elapsed = 0.0
+		ops = 0
+		while elapsed < minTime or ops == 0:
+			state = setup()
+			start = time.perf_counter()
+			ops += run(state)
+			elapsed += time.perf_counter() - start
+		if best is None or elapsed / ops < best:
+			best = elapsed / ops
+	return best
+
+
+###########################
+# Board setup
+###########################
+def makeFleet(nShips):
+	"""
+	Returns a list of nShips ships, alternating Battleships and Submarines
+	"""
+	return [(Battleship if i % 2 == 0 else Submarine)("Ship {}".format(i)) for i in range(nShips)]
+
+def placeFleet(board, ships, rng):
+	"""
+	Places ships on board at random legal positions by trying random
+	origins/directions until one fits (cheap on boards much bigger than the
+	fleet, unlike populateBoard which indexes every placement)
+
+	:return: board
+	"""
+	for ship in ships:
+		while True:
+			direction = rng.choice("RD")
+			if direction == "R":
+				origin = (rng.randrange(board.rows), rng.randrange(board.cols - ship.length + 1))
+			else:
+				origin = (rng.randrange(board.rows - ship.length + 1), rng.randrange(board.cols))
+			ship.setCoords(ship.getStraightCoords(origin, direction))
+			try:
+				board.addShip(ship)
+				break
+			except InvalidShipPlacement:
+				continue
+	return board
+
+def fleetFits(size, nShips):
+	"""
+	True if a fleet of nShips (see makeFleet) fits comfortably on a size x
+	size board: no more than a quarter of the cells taken and the
+	Battleships fit in a row
+	"""
+	return size >= 5 and 4 * 4 * nShips <= size * size
+
+def waterCells(board, count, rng):
+	"""
+	Returns up to count random cells of board with no ship on them
+	"""
+	cells = set()
+	tries = 0
+	while len(cells) < count and tries < 20 * count:
+		tries += 1
+		cell = (rng.randrange(board.rows), rng.randrange(board.cols))
+		if cell not in board.cellIndex:
+			cells.add(cell)
+	return sorted(cells)
+
+
+###########################
+# Benchmarks
+###########################
+def benchBoard(size, nShips, options):
+	"""
+	Runs the benchmarks for one board size and fleet size
+
+	:return: Dictionary of benchmark name to seconds per operation
+	"""
+	rng = random.Random(size * 1000 + nShips)
+	timing = {"repeat": options.repeat, "minTime": options.min_time}
+	results = {}
+
+	def fresh():
+		return Board(size, size, name="Benchmark")
+
+	base = placeFleet(fresh(), makeFleet(nShips), rng)
+	shipCoords = [[tuple(coord.coord) for coord in ship.coords] for ship in base.ships]
+	shipCells = [cell for coords in shipCoords for cell in coords]
+	misses = waterCells(base, 1000, rng)
+
+	# addShip: add the same layout to an empty board
+	def addShipSetup():
+		ships = makeFleet(nShips)
+		for ship, coords in zip(ships, shipCoords):
+			ship.setCoords(coords)
+		return (fresh(), ships)
+	def addShipRun(state):
+		board, ships = state
+		for ship in ships:
+			board.addShip(ship)
+		return len(ships)
+	results["addShip"] = measure(addShipSetup, addShipRun, **timing)
+
+	# processFire on ships, water and cells already fired at
+	def hitRun(board):
+		for cell in shipCells:
+			board.processFire(cell)
+		return len(shipCells)
+	results["processFire.hit"] = measure(base.clone, hitRun, **timing)
+
+	def missRun(board):
+		for cell in misses:
+			board.processFire(cell)
+		return len(misses)
+	results["processFire.miss"] = measure(base.clone, missRun, **timing)
+
+	fired = base.clone()
+	for cell in shipCells + misses:
+		fired.processFire(cell)
+	def duplicateRun(board):
+		for cell in shipCells + misses:
+			try:
+				board.processFire(cell)
+			except HitDuplicate:
+				pass
+		return len(shipCells) + len(misses)
+	results["processFire.duplicate"] = measure(lambda: fired, duplicateRun, **timing)
+
+	def fireDuplicateRun(board):
+		for cell in shipCells + misses:
+			board.fire(cell)
+		return len(shipCells) + len(misses)
+	results["fire.duplicate"] = measure(lambda: fired, fireDuplicateRun, **timing)
+
+	# getHealth
+	def healthRun(board):
+		for i in range(1000):
+			board.getHealth()
+		return 1000
+	results["getHealth"] = measure(lambda: fired, healthRun, **timing)
+
+	# populateBoard(random=True), which indexes every placement on the board
+	if size <= options.max_populate_size:
+		def populateRun(state):
+			board, ships = state
+			with contextlib.redirect_stdout(io.StringIO()):
+				board.populateBoard(ships, random=True)
+			return 1
+		results["populateBoard.random"] = measure(lambda: (fresh(), makeFleet(nShips)), populateRun, **timing)
+
+	# display: a full render of a board with shots on it, and the update
+	# after one more shot
+	if size <= options.max_display_size:
+		for mode in displayModes:
+			name = "{}/{}".format(*mode)
+			results["display.full." + name] = measure(fired.clone, lambda board: (board.display(*mode), 1)[1], **timing)
+
+			def updateSetup():
+				board = base.clone()
+				board.display(*mode)
+				return board
+			def updateRun(board):
+				for cell in misses[:100]:
+					board.processFire(cell)
+					board.display(*mode)
+				return len(misses[:100])
+			results["display.update." + name] = measure(updateSetup, updateRun, **timing)
+
+	# Whole headless games between random players
+	if size <= options.max_game_size:
+		# Game n is always the same game, however many games each run takes
+		gameIndex = [0]
+		def gameSetup():
+			gameRng = random.Random("{} {} {}".format(size, nShips, gameIndex[0]))
+			gameIndex[0] += 1
+			players = []
+			for i in range(2):
+				board = fresh()
+				placeFleet(board, makeFleet(nShips), gameRng)
+				players.append(Player("Player {}".format(i), board=board, playerType="Benchmark",
+				                      shotSelector=randomShotSelector(seed=gameRng.random())))
+			return players
+		results["game.random"] = measure(gameSetup, lambda players: (Game(*players).play(), 1)[1], **timing)
+
+	return results
+
+def benchCoord(options):
+	"""
+	Runs the Coord construction benchmarks
+
+	:return: Dictionary of benchmark name to seconds per operation
+	"""
+	timing = {"repeat": options.repeat, "minTime": options.min_time}
+	cells = [(r, c) for r in range(100) for c in range(100)]
+	coords = [Coord(cell) for cell in cells]
+
+	def tupleRun(state):
+		for cell in cells:
+			Coord(cell)
+		return len(cells)
+	def coordRun(state):
+		for coord in coords:
+			Coord(coord)
+		return len(coords)
+	return {"Coord.fromTuple": measure(lambda: None, tupleRun, **timing),
+	        "Coord.fromCoord": measure(lambda: None, coordRun, **timing)}
+
+def runAll(options):
+	"""
+	Runs every benchmark
+
+	:return: Dictionary of benchmark name to seconds per operation
+	"""
+	results = {}
+	results.update(benchCoord(options))
+	for size in options.sizes:
+		for nShips in options.fleets:
+			if not fleetFits(size, nShips):
+				continue
+			if not options.quiet:
+				print("Running {0}x{0} board, {1} ships...".format(size, nShips), file=sys.stderr)
+			for name, seconds in benchBoard(size, nShips, options).items():
+				results["{0}/{1}x{1}/{2}ships".format(name, size, nShips)] = seconds
+	return results
+
+
+###########################
+# Reporting
+###########################
+def formatTime(seconds):
+	"""
+	Returns seconds in the most readable of s/ms/us/ns
+	"""
+	for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+		if seconds >= scale:
+			return "{:.3g} {}".format(seconds / scale, unit)
+	return "{:.3g} ns".format(seconds / 1e-9)
+
+def compare(results, baseline, threshold):
+	"""
+	Prints results next to baseline and returns the names of the benchmarks
+	that are more than threshold (fractionally) slower than the baseline
+	"""
+	regressions = []
+	width = max(len(name) for name in results)
+	print("{:<{}}  {:>10}  {:>10}  {:>7}".format("benchmark", width, "baseline", "current", "ratio"))
+	for name in sorted(results):
+		current = results[name]
+		if name not in baseline:
+			print("{:<{}}  {:>10}  {:>10}  {:>7}".format(name, width, "-", formatTime(current), "new"))
+			continue
+		ratio = current / baseline[name]
+		flag = ""
+		if ratio > 1 + threshold:
+			flag = "  SLOWER"
+			regressions.append(name)
+		elif ratio < 1 / (1 + threshold):
+			flag = "  faster"
+		print("{:<{}}  {:>10}  {:>10}  {:>7.2f}{}".format(name, width, formatTime(baseline[name]),
+		                                                  formatTime(current), ratio, flag))
+	return regressions
+
+def report(results):
+	"""
+	Prints the results as a table
+	"""
+	width = max(len(name) for name in results)
+	for name in sorted(results):
+		print("{:<{}}  {:>10}".format(name, width, formatTime(results[name])))
+
+
+def main(argv = None):
+	parser = argparse.ArgumentParser(description="Benchmark the Board, Ship and rendering hot paths")
+	parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 2000],
+	                    help="Board sizes (rows = cols) to run (default: 10 100 1000 2000)")
+	parser.add_argument("--fleets", type=int, nargs="+", default=[3, 30],
+	                    help="Numbers of ships to run with (default: 3 30)")
+	parser.add_argument("--quick", action="store_true", help="Only run 10x10 and 100x100 boards")
+	parser.add_argument("--repeat", type=int, default=3, help="Runs to take the best of (default: 3)")
+	parser.add_argument("--min-time", type=float, default=0.05,
+	                    help="Minimum seconds timed per run (default: 0.05)")
+	parser.add_argument("--max-populate-size", type=int, default=1000,
+	                    help="Largest board to benchmark populateBoard on (default: 1000)")
+	parser.add_argument("--max-display-size", type=int, default=2000,
+	                    help="Largest board to benchmark display on (default: 2000)")
+	parser.add_argument("--max-game-size", type=int, default=100,
+	                    help="Largest board to play whole games on (default: 100)")
+	parser.add_argument("--output", help="Write the results to this JSON file")
+	parser.add_argument("--baseline", help="Compare against results saved with --output")
+	parser.add_argument("--threshold", type=float, default=0.2,
+	                    help="Fraction slower than the baseline that counts as a regression (default: 0.2)")
+	parser.add_argument("--quiet", action="store_true", help="Don't print progress")
+	options = parser.parse_args(argv)
+	if options.quick:
+		options.sizes = [size for size in options.sizes if size <= 100]
+
+	results = runAll(options)
+
+	if options.output:
+		data = {"python": platform.python_version(),
+		        "platform": platform.platform(),
+		        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+		        "results": results}
+		with open(options.output, "w") as f:
+			json.dump(data, f, indent=1, sort_keys=True)
+
+	if options.baseline:
+		with open(options.baseline) as f:
+			baseline = json.load(f)["results"]
+		regressions = compare(results, baseline, options.threshold)
+		if regressions:
+			print("{} benchmarks more than {:.0%} slower than the baseline".format(len(regressions), options.threshold))
+			return 1
+	else:
+		report(results)
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
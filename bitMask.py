@@ -0,0 +1,59 @@
+def cellBit(row, col, cols):
+	"""
+	Returns the single-bit mask for cell (row, col) on a board with cols columns.
+
+	Cells are numbered row-major, so (0,0) is bit 0, (0,1) is bit 1, ...,
+	(1,0) is bit cols, etc.
+
+	:param row: Row of the cell
+	:param col: Column of the cell
+	:param cols: Number of columns on the board
+	:return: Integer with only the bit for (row, col) set
+	"""
+	return 1 << (row * cols + col)
+
+def popcount(mask):
+	"""
+	Returns the number of set bits in an integer mask
+
+	:param mask: Non-negative integer
+	:return: Integer count of the bits set in mask
+	"""
+	return bin(mask).count("1")
+
+# Python 3.10+ counts the bits without making a string
+if hasattr(int, "bit_count"):
+	popcount = int.bit_count
+
+def iterBits(mask):
+	"""
+	Generator that yields the index of each set bit in an integer mask, lowest
+	bit first.
+
+	:param mask: Non-negative integer
+	:return: Generator of integer bit indices
+	"""
+	while mask:
+		# mask & -mask isolates the lowest set bit
+		lowBit = mask & -mask
+		yield lowBit.bit_length() - 1
+		mask ^= lowBit
+
+def iterCells(mask, cols):
+	"""
+	Generator that yields (row, col) for each set bit in a board mask
+
+	:param mask: Non-negative integer board mask (see cellBit for numbering)
+	:param cols: Number of columns on the board
+	:return: Generator of (row, col) tuples
+	"""
+	for index in iterBits(mask):
+		yield divmod(index, cols)
+
+
+#### Debug code
+if __name__ == '__main__':
+	mask = cellBit(0, 0, 10) | cellBit(2, 3, 10) | cellBit(9, 9, 10)
+	print("mask: {}".format(bin(mask)))
+	print("popcount: {}".format(popcount(mask)))
+	print("cells: {}".format(list(iterCells(mask, 10))))
@@ -1,4 +1,10 @@
-def chooseFromList(message, choices, nullChoice=None, debug = True):
+import tracing
+
+# Trace points for this module (see tracing)
+_trace = tracing.getTracer("chooseFromList")
+
+
+def chooseFromList(message, choices, nullChoice=None):
 	print(message)
 	if nullChoice is not None:
 		print("Enter:\t{}".format(nullChoice))
@@ -15,8 +21,7 @@ def chooseFromList(message, choices, nullChoice=None, debug = True):
 			print("Invalid choice.  Please choose again")
 			continue
 		if choice in range(len(choices)):
-			if debug == True:
-				print("received valid choice {} corresponding to {}".format(choice, choices[choice]))
+			if _trace.enabled: _trace("choice", "Received valid choice {} corresponding to {}", choice, choices[choice])
 			break
 		else:
 			print("Invalid choice.  Please choose again")
@@ -0,0 +1,161 @@
+import random
+
+from bitMask import iterCells
+from Ship import shipType2Ship
+
+
+class PlacementMasks(object):
+	"""
+	Every straight placement of a ship of one length on an empty rows x cols
+	board, as integer masks (see bitMask.cellBit for the bit numbering).
+	Right-pointing placements are numbered first, then down-pointing ones, each
+	in row-major order of their origin.
+
+	Only the mask of a placement at the origin is kept for each direction and
+	placement i is shifted into place when it is asked for (masks[i]), so
+	big boards don't hold a board-sized integer for every placement.
+	"""
+
+	def __init__(self, rows, cols, length):
+		"""
+		:param rows: Number of rows on the board
+		:param cols: Number of columns on the board
+		:param length: Ship length
+		"""
+		self.cols = cols
+		self.rightMask = (1 << length) - 1
+		self.rightPerRow = max(cols - length + 1, 0)
+		self.nRight = rows * self.rightPerRow
+
+		self.downMask = 0
+		for k in range(length):
+			self.downMask |= 1 << (k * cols)
+		# Down-pointing placements start at every cell of the first
+		# rows - length + 1 rows, so their origin bit is just their number
+		self.nDown = max(rows - length + 1, 0) * cols
+
+	def __len__(self):
+		return self.nRight + self.nDown
+
+	def __getitem__(self, index):
+		"""
+		:param index: Number of the placement, 0 <= index < len(self)
+		:return: Integer mask of the placement
+		"""
+		if index < self.nRight:
+			r, c = divmod(index, self.rightPerRow)
+			return self.rightMask << (r * self.cols + c)
+		return self.downMask << (index - self.nRight)
+
+
+def generateLayouts(rows, cols, fleet, seed = None, count = 1, asShips = False):
+	"""
+	Generator of random legal fleet layouts that doesn't need a Board.
+
+	Each ship is placed, in fleet order, uniformly at random among the
+	straight placements that fit on the board and don't overlap the ships
+	already placed - the same rule as Board.populateBoard(random=True).  Nothing
+	is printed.
+
+	Layouts are yielded as a tuple with one integer mask per ship (in fleet
+	order, bit numbering as in bitMask.cellBit).  OR them together for the
+	occupancy of the whole fleet.  If asShips == True, a list of Ship objects
+	with their coordinates set is yielded instead (see layoutToShips) - this is
+	much slower.
+
+	:param rows: Number of rows on the board
+	:param cols: Number of columns on the board
+	:param fleet: List of Ship subclasses or the names of Ship subclasses (as
+				  for shipType2Ship)
+	:param seed: (Optional) Seed for the random number generator.  The same
+				 seed gives the same sequence of layouts.
+	:param count: Number of layouts to generate.  None generates forever.
+	:param asShips: If True, yield lists of Ship objects rather than masks
+	:return: Generator of layouts
+	"""
+	rng = random.Random(seed)
+	fleetShips = shipType2Ship(shipTypes=fleet)
+	lengths = [ship.length for ship in fleetShips]
+
+	if sum(lengths) > rows * cols:
+		raise ValueError("Fleet needs {} cells but the board only has {}".format(sum(lengths), rows * cols))
+
+	# Every placement for each distinct length, shared between ships of the
+	# same length
+	masksByLength = {}
+	for length in lengths:
+		if not length in masksByLength:
+			masksByLength[length] = PlacementMasks(rows, cols, length)
+	shipMasks = [masksByLength[length] for length in lengths]
+
+	# Locals for speed in the loop below
+	rand = rng.random
+	nShips = len(shipMasks)
+
+	# Number of random picks to try for a ship before falling back to listing
+	# the placements that still fit.  On reasonably open boards almost every
+	# ship is placed on the first or second pick.
+	maxTries = 32
+
+	made = 0
+	while count is None or made < count:
+		occupied = 0
+		layout = [0] * nShips
+		for i in range(nShips):
+			masks = shipMasks[i]
+			n = len(masks)
+			for tries in range(maxTries):
+				mask = masks[int(rand() * n)]
+				if not mask & occupied:
+					break
+			else:
+				# Crowded board - choose from what is left directly
+				fits = [j for j in range(n) if not masks[j] & occupied]
+				if len(fits) == 0:
+					# Earlier ships left no room for this one.  Start the
+					# layout over.
+					break
+				mask = masks[fits[int(rand() * len(fits))]]
+			occupied |= mask
+			layout[i] = mask
+		else:
+			made += 1
+			if asShips:
+				yield layoutToShips(layout, cols, fleet)
+			else:
+				yield tuple(layout)
+
+
+def layoutToShips(layout, cols, fleet):
+	"""
+	Makes Ship objects for a layout from generateLayouts
+
+	:param layout: Tuple of integer ship masks
+	:param cols: Number of columns on the board the layout was made for
+	:param fleet: The fleet the layout was made for (see generateLayouts)
+	:return: List of Ship objects with coordinates set
+	"""
+	ships = shipType2Ship(shipTypes=fleet)
+	for ship, mask in zip(ships, layout):
+		# Bits come out lowest first, which is the origin end of a right or
+		# down pointing ship
+		ship.setCoords(list(iterCells(mask, cols)))
+	return ships
+
+
+#### Debug code
+if __name__ == '__main__':
+	import time
+
+	fleet = ["Battleship", "Battleship", "Submarine", "Submarine", "Submarine"]
+	for ships in generateLayouts(10, 10, fleet, seed=0, count=2, asShips=True):
+		for ship in ships:
+			print(ship)
+		print()
+
+	n = 100000
+	start = time.time()
+	for layout in generateLayouts(10, 10, fleet, seed=0, count=n):
+		pass
+	elapsed = time.time() - start
+	print("{} layouts in {:.3f}s ({:.0f} layouts/sec)".format(n, elapsed, n / elapsed))
@@ -0,0 +1,92 @@
+import tracing
+
+# Trace points for this module (see tracing)
+_trace = tracing.getTracer("lst2str")
+
+
+def lst2str(lst, colSep ="", rowSep ="\n", validate = False, stream = None):
+	"""
+	Returns a string representation of a 2D list.
+
+	Each row is turned into one line: its elements joined by colSep, followed
+	by rowSep.  With the default colSep, rows that are already strings are
+	used as they are, and rows that aren't iterable (ie, a 1D list) are
+	converted with str().
+
+	The lines are built once each and joined (or written) in a single pass,
+	so the time taken is linear in the size of the output.
+
+	:param colSep: Character to seperate each column element (default is "")
+	:param rowSep: Character to seperate each row (default is newline)
+	:param validate: If True, first check that lst is a list of at most two
+					 dimensions whose elements are strings, integers or floats
+					 (raises TypeError if not)
+	:param stream: (Optional) Text stream (anything with a .write(), eg an
+				   open file).  If given, each line is written straight to it
+				   as it is made instead of building a string.
+	:return: String representation of the list, or None if stream is given
+
+	"""
+
+	# Check for valid input (is 1D or 2D list)
+	if validate:
+		if isinstance(lst,list):
+			for row in lst:
+				if isinstance(row,list):
+					for col in row:
+						if isinstance(col,list):
+							raise TypeError("Error: List cannot have more than two dimensions")
+						elif not (isinstance(col,str) or isinstance(col,int) or isinstance(col,float)):
+							raise TypeError("Error: Base elements in list must be strings, integers, or floats")
+		else:
+			raise TypeError("Error: Input is not a list")
+
+	lines = _lines(lst, colSep, rowSep)
+	if stream is None:
+		return "".join(lines)
+	for line in lines:
+		stream.write(line)
+
+
+def _lines(lst, colSep, rowSep):
+	"""
+	Generator of the output lines (including rowSep) of lst2str
+	"""
+	for row in lst:
+		if not colSep and isinstance(row, str):
+			# Joining a string's characters with "" gives the string back
+			line = row + rowSep
+		else:
+			try:
+				# Fast path: everything in the row is already a string
+				line = colSep.join(row) + rowSep
+			except TypeError:
+				try:
+					line = colSep.join([str(x) for x in row]) + rowSep
+				except TypeError:
+					# Row isn't iterable
+					line = str(row) + rowSep
+		if _trace.enabled: _trace("line", "Output line is: {!r}", line)
+		yield line
+
+
+#### Debug code
+if __name__ == '__main__':
+	import io
+
+	lists = []
+	lists.append([0,1,2,3])
+	lists.append([[10,11,12],[20,21,22],[30,31,32]])
+	lists.append([0,1,2,[50,51,52,[100,101]]])
+
+	for i,lst in enumerate(lists):
+		print("Printing test list {}".format(i))
+		try:
+			print(lst2str(lst, validate=True))
+		except TypeError as e:
+			print("caught exception: {}".format(e))
+
+	print("Streaming test list 1 with colSep=\",\"")
+	stream = io.StringIO()
+	lst2str(lists[1], colSep=",", stream=stream)
+	print(stream.getvalue())
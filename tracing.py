@@ -0,0 +1,172 @@
+import collections
+import sys
+import time
+
+
+# One traced event, as returned by records().  message is formatted when
+# the record is read, not when it is traced.
+TraceRecord = collections.namedtuple("TraceRecord", ["time", "module", "point", "message"])
+
+# Whether tracing is on for modules that haven't been switched on/off
+# individually (see enable/disable)
+_globalEnabled = False
+
+# Per module settings from enable/disable, overriding _globalEnabled
+_moduleEnabled = {}
+
+# Tracer for each module name
+_tracers = {}
+
+# Ring buffer of (time, module, point, message format, args) for the most
+# recent trace events
+_buffer = collections.deque(maxlen=10000)
+
+
+################################################################################
+# Tracer class
+################################################################################
+class Tracer(object):
+	"""
+	Named trace points for one module.  Get one with getTracer and guard each
+	trace point with its enabled flag so that nothing (not even the argument
+	tuple) is built while tracing is off:
+
+		_trace = tracing.getTracer("Board")
+		...
+		if _trace.enabled: _trace("addShip.overlap", "Ship {} overlaps {}", ship.name, other.name)
+
+	The message is only formatted (message.format(*args)) when the record is
+	read, so the arguments are kept as they are until then - pass values
+	that won't change afterwards (eg strings or numbers, not lists).
+	"""
+	__slots__ = ("module", "enabled")
+
+	def __init__(self, module):
+		self.module = module
+		self.enabled = _moduleEnabled.get(module, _globalEnabled)
+
+	def __call__(self, point, message = "", *args):
+		"""
+		Records a trace event in the ring buffer
+
+		:param point: Name of the trace point (eg "processFire.hit")
+		:param message: Message, as a str.format format string for args
+		:param args: Values for message
+		:return: Nothing
+		"""
+		if self.enabled:
+			_buffer.append((time.time(), self.module, point, message, args))
+
+	def __repr__(self):
+		return "Tracer({!r}, enabled={})".format(self.module, self.enabled)
+
+
+###########################
+# Module Methods
+###########################
+def getTracer(module):
+	"""
+	Returns the Tracer for module, making it if needed
+
+	:param module: Name for the module's trace points (usually the module name)
+	:return: Tracer
+	"""
+	tracer = _tracers.get(module)
+	if tracer is None:
+		tracer = _tracers[module] = Tracer(module)
+	return tracer
+
+def enable(module = None):
+	"""
+	Turns tracing on for module, or for every module not turned off
+	individually if module is None
+	"""
+	_setEnabled(module, True)
+
+def disable(module = None):
+	"""
+	Turns tracing off for module, or for every module not turned on
+	individually if module is None
+	"""
+	_setEnabled(module, False)
+
+def reset():
+	"""
+	Turns tracing off everywhere, forgetting per module settings
+	"""
+	global _globalEnabled
+	_globalEnabled = False
+	_moduleEnabled.clear()
+	_refresh()
+
+def _setEnabled(module, enabled):
+	"""
+	Records the setting and updates the enabled flag of each Tracer
+	"""
+	global _globalEnabled
+	if module is None:
+		_globalEnabled = enabled
+	else:
+		_moduleEnabled[module] = enabled
+	_refresh()
+
+def _refresh():
+	"""
+	Updates the enabled flag of each Tracer from the settings
+	"""
+	for module, tracer in _tracers.items():
+		tracer.enabled = _moduleEnabled.get(module, _globalEnabled)
+
+def setBufferSize(size):
+	"""
+	Sets how many of the most recent trace events are kept, keeping the
+	newest of those already recorded
+
+	:param size: Number of events
+	:return: Nothing
+	"""
+	global _buffer
+	_buffer = collections.deque(_buffer, maxlen=size)
+
+def clear():
+	"""
+	Empties the ring buffer
+	"""
+	_buffer.clear()
+
+def records(module = None):
+	"""
+	Returns the trace events in the ring buffer, oldest first
+
+	:param module: (Optional) Only return events from this module
+	:return: List of TraceRecord
+	"""
+	return [TraceRecord(t, m, point, message.format(*args)) for (t, m, point, message, args) in list(_buffer)
+	        if module is None or m == module]
+
+def dump(stream = None, module = None):
+	"""
+	Writes the trace events in the ring buffer to stream, one per line
+
+	:param stream: (Optional) Text stream to write to (default is stdout)
+	:param module: (Optional) Only write events from this module
+	:return: Nothing
+	"""
+	if stream is None:
+		stream = sys.stdout
+	for record in records(module):
+		stream.write("{:.6f} {}.{}: {}\n".format(record.time, record.module, record.point, record.message))
+
+
+###########################
+# Test code for the methods
+###########################
+if __name__ == '__main__':
+	trace = getTracer("demo")
+	trace("skipped", "Not recorded - tracing is off")
+	enable("demo")
+	for i in range(3):
+		if trace.enabled: trace("loop", "Iteration {} of {}", i, 3)
+	disable()
+	print(trace)
+	dump()